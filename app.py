@@ -1,15 +1,33 @@
-from flask import Flask, request, jsonify
-from flask_cors import CORS
-import logging
-from pymongo import MongoClient
 import os
+# Must be set before torch is imported (via sentence-transformers) to size its thread pools
+os.environ.setdefault('OMP_NUM_THREADS', str(min(8, os.cpu_count() or 4)))
+
+from flask import Flask, request, jsonify, Response, stream_with_context
+from werkzeug.exceptions import RequestEntityTooLarge
+import logging
+import re
+import time
+import queue
+import atexit
+import threading
+from functools import wraps
+from cachetools import TTLCache, cached as memoize
+from concurrent.futures import ThreadPoolExecutor
+from pymongo import MongoClient, UpdateOne
 from datetime import datetime
 import traceback
 from config.config import Config
 from models.category_manager import CategoryManager
-from utils.database_manager import DatabaseManager
 from models.hybrid_recommender import HybridRecommender
 from services.mongodb_recommendation import MongoDBService
+from utils.json_provider import init_json_provider
+from utils.compression import init_compression
+from qdrant_client.models import PointStruct
+
+try:
+    import redis
+except ImportError:
+    redis = None
 
 # Configuration
 logging.basicConfig(
@@ -17,29 +35,130 @@ logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
+
+# Service singletons, set once by init_services()
 recommender = None
 category_manager = None
 db_manager = None
+
 BLOCKED_TERMS = {
     'porn', 'pornhub', 'xxx', 'sex', 'nude', 'nsfw', 
     'adult', 'explicit', 'erotic', 'naked', 'xvideos',
     'redtube', 'youporn'
 }
+# One case-insensitive alternation scanned once per query; longest terms first so the overlap order never matters
+_BLOCK_RE = re.compile('|'.join(map(re.escape, sorted(BLOCKED_TERMS, key=len, reverse=True))), re.IGNORECASE)
 
 SKIP_CATEGORIES = ['general', 'other', 'unknown', 'misc']
 
 app = Flask(__name__)
-CORS(app)
+# Werkzeug enforces the body limit on the stream itself, so chunked/length-less bodies are capped too
+app.config['MAX_CONTENT_LENGTH'] = Config.MAX_JSON_BODY
+init_json_provider(app)
+init_compression(app, min_size=Config.COMPRESS_MIN_SIZE)
+
+# The API is open to every origin, so CORS is three constant headers rather than Flask-CORS's per-request matching
+CORS_HEADERS = {
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Headers': '*',
+    'Access-Control-Allow-Methods': 'GET, POST, OPTIONS'
+}
+
+
+@app.after_request
+def add_cors_headers(response):
+    # Preflights are answered by Flask's automatic OPTIONS handling on each route
+    response.headers.update(CORS_HEADERS)
+    return response
+
+# Shared pool for independent blocking MongoDB calls (PyMongo releases the GIL on socket I/O)
+io_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix='mongo-io')
 
 # Configuration from environment or defaults
-MONGO_URI = os.getenv('MONGO_URI', 'mongodb://localhost:27017/')
-MONGO_DB = os.getenv('MONGO_DB', 'recommendation_db')
-GORSE_API_URL = os.getenv('GORSE_API_URL', 'http://localhost:8087 ')
-LLAMA_API_URL = os.getenv('LLAMA_API_URL', 'http://localhost:11434')
+MONGO_URI = Config.MONGO_URI
+MONGO_DB = Config.MONGO_DB
+GORSE_API_URL = Config.GORSE_API_URL
+LLAMA_API_URL = Config.LLAMA_API_URL
+
+REDIS_URL = Config.REDIS_URL
+
+# Response cache for slow-changing aggregate endpoints; the API works unchanged without Redis
+cache_client = None
+if redis is not None and REDIS_URL:
+    try:
+        cache_client = redis.Redis.from_url(REDIS_URL, socket_timeout=0.2, socket_connect_timeout=0.5)
+        cache_client.ping()
+        logger.info("✅ Redis response cache connected")
+    except Exception as e:
+        logger.warning(f"⚠️ Redis unavailable, response cache disabled: {e}")
+        cache_client = None
+
+
+def _cache_key(namespace, path, args=None):
+    query = '&'.join(f"{k}={v}" for k, v in sorted(args.items(multi=True))) if args else ''
+    return f"{namespace}:{path}?{query}"
+
+
+def cached(namespace, ttl):
+    """Cache successful JSON responses in Redis under namespace:path?sorted-args for ttl seconds"""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if cache_client is None:
+                return view(*args, **kwargs)
+            key = _cache_key(namespace, request.path, request.args)
+            try:
+                body = cache_client.get(key)
+                if body is not None:
+                    return Response(body, mimetype='application/json')
+            except Exception as e:
+                logger.warning(f"Cache read failed: {e}")
+            response = app.make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                try:
+                    cache_client.setex(key, ttl, response.get_data())
+                except Exception as e:
+                    logger.warning(f"Cache write failed: {e}")
+            return response
+        return wrapper
+    return decorator
+
+
+def invalidate_cache(namespace, path):
+    """Drop the argument-less cached response for one path (single DEL; variants with args expire by TTL)"""
+    if cache_client is None:
+        return
+    try:
+        cache_client.delete(_cache_key(namespace, path))
+    except Exception as e:
+        logger.warning(f"Cache invalidation failed: {e}")
+
+
+def invalidate_cache_namespace(namespace):
+    """Drop every cached response under a namespace (SCAN, so only for rare writes such as training)"""
+    if cache_client is None:
+        return
+    try:
+        keys = list(cache_client.scan_iter(f"{namespace}:*", count=1000))
+        if keys:
+            cache_client.delete(*keys)
+    except Exception as e:
+        logger.warning(f"Cache invalidation failed: {e}")
+
 
 # MongoDB Connection - CORRECT WAY ✅
 try:
-    client = MongoClient(MONGO_URI)  # MongoClient-ஐ use பண்ணு, MONGO_URI-ஐ இல்ல!
+    # Pool must cover gunicorn's gevent worker_connections (see gunicorn.conf.py); warm connections
+    # skip per-request handshakes and zstd shrinks the long article bodies on the wire
+    client = MongoClient(  # MongoClient-ஐ use பண்ணு, MONGO_URI-ஐ இல்ல!
+        MONGO_URI,
+        maxPoolSize=int(os.getenv('MONGO_MAX_POOL_SIZE', 1000)),
+        minPoolSize=int(os.getenv('MONGO_MIN_POOL_SIZE', 10)),
+        connectTimeoutMS=2000,
+        socketTimeoutMS=int(os.getenv('MONGO_SOCKET_TIMEOUT_MS', 5000)),
+        retryWrites=True,
+        compressors='zstd,zlib'
+    )
     db = client[MONGO_DB]  # Use MONGO_DB variable
     # Test connection
     client.server_info()
@@ -49,23 +168,134 @@ except Exception as e:
     client = None
     db = None
 
-# Initialize services (Singleton pattern)
-category_manager = None
-recommender = None
-db_manager = None  
+# Resolve hot collections once instead of through db.__getattr__ on every request
+articles_collection = db.articles if db is not None else None
+users_collection = db.users if db is not None else None
+
+# Indexes backing the query shapes used by the endpoints below (create_index is a no-op when present)
+INDEXES = [
+    ('articles', [('category', 1), ('views', -1)], {}),
+    ('articles', [('views', -1)], {}),
+    ('users', [('user_id', 1)], {'unique': True}),
+    ('user_interests', [('user_id', 1), ('category', 1)], {'unique': True}),
+    ('interactions', [('user_id', 1), ('timestamp', -1)], {}),
+]
+
+
+def ensure_indexes():
+    for collection_name, keys, options in INDEXES:
+        try:
+            db[collection_name].create_index(keys, **options)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not create index {collection_name} {keys}: {e}")
+
+
+if db is not None:
+    ensure_indexes()
+
+
+# Most repeat requests for a user arrive within a minute; invalidate on every user write
+_user_cache = TTLCache(maxsize=50_000, ttl=60)
+_user_cache_lock = threading.Lock()
+
+
+@memoize(_user_cache, key=lambda user_id: user_id, lock=_user_cache_lock)
+def get_user(user_id):
+    """users document for user_id (or None), cached for 60s"""
+    return users_collection.find_one({'user_id': user_id})
+
+
+def invalidate_user(user_id):
+    with _user_cache_lock:
+        _user_cache.pop(user_id, None)
+
+
+# Search queries are heavily skewed, so repeats within a minute skip LLaMA/embedding detection
+_category_cache = TTLCache(maxsize=10_000, ttl=60)
+_categories_cache = TTLCache(maxsize=1, ttl=300)
+_category_cache_lock = threading.Lock()
+
+
+@memoize(_category_cache, key=lambda query: query.lower().strip(), lock=_category_cache_lock)
+def detect_query_category(query):
+    return category_manager.detect_query_category(query)
+
+
+@memoize(_categories_cache, key=lambda: 'all', lock=_category_cache_lock)
+def get_all_categories():
+    return category_manager.get_all_categories()
+
+
+def invalidate_categories():
+    """Forget cached detections, the category list and cached category responses after (re)training"""
+    with _category_cache_lock:
+        _category_cache.clear()
+        _categories_cache.clear()
+    for namespace in ('categories', 'category'):
+        invalidate_cache_namespace(namespace)
+
+
+# Stringify ObjectIds on the server instead of looping over results in Python
+STRINGIFY_ID = {'$addFields': {'_id': {'$toString': '$_id'}}}
+
+
+def find_articles(match, limit=0, skip=0, sort=None):
+    """find()-equivalent over db.articles that returns documents with string _id"""
+    return list(iter_articles(match, limit=limit, skip=skip, sort=sort))
+
+
+def iter_articles(match, limit=0, skip=0, sort=None):
+    """Cursor form of find_articles, for streaming responses"""
+    pipeline = [{'$match': match}]
+    if sort:
+        pipeline.append({'$sort': sort})
+    if skip:
+        pipeline.append({'$skip': skip})
+    options = {}
+    if limit:
+        pipeline.append({'$limit': limit})
+        # Size the first batch to the page so small pages come back in a single reply
+        options['batchSize'] = min(limit, 1000)
+    pipeline.append(STRINGIFY_ID)
+    return articles_collection.aggregate(pipeline, **options)
+
+
+def stream_json(payload, key):
+    """Stream payload as a JSON object, emitting payload[key] (any iterable) one item at a time"""
+    items = payload[key]
+    head = app.json.dumps({k: v for k, v in payload.items() if k != key})
+    
+    def generate():
+        yield head[:-1] + (',' if len(head) > 2 else '') + app.json.dumps(key) + ':['
+        for i, item in enumerate(items):
+            yield (',' if i else '') + app.json.dumps(item)
+        yield ']}'
+    
+    return Response(stream_with_context(generate()), mimetype='application/json')
+
+
+_iso_now_cache = (0, '')
+
+
+def iso_now():
+    """UTC ISO-8601 timestamp for response metadata, formatted at most once per second"""
+    global _iso_now_cache
+    second = int(time.time())
+    cached_second, stamp = _iso_now_cache
+    if second != cached_second:
+        stamp = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(second))
+        _iso_now_cache = (second, stamp)
+    return stamp
 
 
 def is_safe_query(query: str) -> tuple:
     """Check if query is safe for processing"""
-    if not query or len(query.strip()) == 0:
+    if not query or query.isspace():
         return False, "Empty query"
     
-    query_lower = query.lower().strip()
-    
     # Check blocked terms
-    for term in BLOCKED_TERMS:
-        if term in query_lower:
-            return False, "Inappropriate content detected"
+    if _BLOCK_RE.search(query):
+        return False, "Inappropriate content detected"
     
     # Check length
     if len(query) > 500:
@@ -73,6 +303,42 @@ def is_safe_query(query: str) -> tuple:
     
     return True, "OK"
 
+
+FORM_MIMETYPES = ('multipart/form-data', 'application/x-www-form-urlencoded')
+
+
+def _body_too_large():
+    return jsonify({'error': f'Request body too large (max {Config.MAX_JSON_BODY} bytes)'}), 413
+
+
+def json_body(*required, message=None, allow_form=False):
+    """
+    Parse the JSON body once (through app.json, i.e. orjson when installed) and check required fields
+
+    Returns (data, None) or (None, error_response). Missing/non-object bodies are a 400, not a 500;
+    bodies over Config.MAX_JSON_BODY are a 413 and are never read past the limit. With allow_form, form posts are
+    read as plain fields so long texts skip JSON string escaping.
+    """
+    # Fast path on the declared length; bodies without one are cut off by MAX_CONTENT_LENGTH while reading
+    if (request.content_length or 0) > Config.MAX_JSON_BODY:
+        return None, _body_too_large()
+    try:
+        if allow_form and request.mimetype in FORM_MIMETYPES:
+            data = request.form.to_dict()
+        else:
+            # Length-less (chunked) bodies are truncated at MAX_CONTENT_LENGTH, so one that fills it is too large
+            if request.content_length is None and len(request.get_data()) >= Config.MAX_JSON_BODY:
+                return None, _body_too_large()
+            data = request.get_json(silent=True, cache=False)
+    except RequestEntityTooLarge:
+        return None, _body_too_large()
+    if not isinstance(data, dict):
+        return None, (jsonify({'error': 'JSON object body required'}), 400)
+    if any(not data.get(field) for field in required):
+        return None, (jsonify({'error': message or f"{', '.join(required)} required"}), 400)
+    return data, None
+
+
 def init_services():
     """Initialize recommendation services"""
     global recommender, db_manager, category_manager
@@ -81,15 +347,7 @@ def init_services():
             logger.error("Database not connected, cannot initialize services")
             return False
         
-        # MongoDB configuration
-        MONGO_URI = os.getenv('MONGO_URI', 'mongodb://localhost:27017/')
-        MONGO_DB = os.getenv('MONGO_DB', 'recommendation_db')
-        
-        # Gorse configuration
-        GORSE_API_URL = os.getenv('GORSE_API_URL', 'http://localhost:8089')
-        
         # Initialize CategoryManager first
-        from models.category_manager import CategoryManager
         category_manager = CategoryManager(
             mongo_uri=MONGO_URI,
             mongo_db=MONGO_DB
@@ -101,7 +359,8 @@ def init_services():
             mongo_db=MONGO_DB,
             gorse_api_url=GORSE_API_URL,
             category_manager=category_manager,
-            embedding_model=Config.EMBEDDING_MODEL
+            embedding_model=Config.EMBEDDING_MODEL,
+            quantize_embeddings=Config.EMBEDDING_QUANTIZE
         )
         
         # Initialize MongoDB service (replace SQLite DatabaseManager)
@@ -117,13 +376,138 @@ def init_services():
         logger.error(f"Failed to initialize services: {e}")
         return False
 
+# Set once the warmup thread has finished (successfully or not)
+services_ready = threading.Event()
+
+# Endpoints that only touch MongoDB or the write-behind queue keep serving while models load
+WARMUP_EXEMPT_ENDPOINTS = {'health', 'get_articles', 'simple_recommend', 'track_interaction', 'static'}
+
+
+def _warmup():
+    """Load models/services once, off the import path so the app can start serving immediately"""
+    try:
+        if init_services():
+            # Category indexes are built off the warmup path so a slow server never delays readiness
+            io_pool.submit(category_manager.ensure_indexes)
+            try:
+                get_all_categories()
+            except Exception as e:
+                logger.warning(f"Could not prefetch categories: {e}")
+    finally:
+        services_ready.set()
+
+
+threading.Thread(target=_warmup, name='warmup', daemon=True).start()
+
+
 @app.before_request
-def before_request():
-    """Initialize services before handling requests"""
+def require_services():
+    if not services_ready.is_set() and request.method != 'OPTIONS' and request.endpoint not in WARMUP_EXEMPT_ENDPOINTS:
+        return jsonify({'error': 'Service is warming up, retry shortly'}), 503
+
+
+# ============================================================
+# WRITE-BEHIND QUEUE
+# ============================================================
+
+WRITE_BATCH_SIZE = 500
+WRITE_FLUSH_INTERVAL = 0.1  # seconds
+
+# Items are ('track', (user_id, post_id, action)) or ('write', collection_name, pymongo write op)
+write_queue = queue.Queue()
+
+
+def _flush_writes(batch):
+    """Apply one drained batch: tracked interactions in bulk, raw ops as one bulk_write per collection"""
+    events = [item[1] for item in batch if item[0] == 'track']
+    ops_by_collection = {}
+    for item in batch:
+        if item[0] == 'write':
+            ops_by_collection.setdefault(item[1], []).append(item[2])
+    
+    if events:
+        try:
+            recommender.track_interactions_bulk(events)
+            # Only now are the new counts visible, so drop cached stats once per batch
+            invalidate_cache('stats', '/api/stats')
+        except Exception as e:
+            logger.error(f"❌ Interaction flush failed ({len(events)} events): {e}")
+    for collection_name, ops in ops_by_collection.items():
+        try:
+            db[collection_name].bulk_write(ops, ordered=False)
+        except Exception as e:
+            logger.error(f"❌ Bulk write to {collection_name} failed ({len(ops)} ops): {e}")
+
+
+def _drain(source, batch_size, block=True):
+    """Take one item (waiting if block), then whatever else arrives within WRITE_FLUSH_INTERVAL"""
     try:
-        init_services()
+        batch = [source.get(timeout=None if block else 0)]
+    except queue.Empty:
+        return []
+    deadline = time.monotonic() + WRITE_FLUSH_INTERVAL
+    while len(batch) < batch_size:
+        remaining = deadline - time.monotonic() if block else 0
+        try:
+            batch.append(source.get(timeout=remaining) if remaining > 0 else source.get_nowait())
+        except queue.Empty:
+            break
+    return batch
+
+
+def _start_batch_worker(source, flush, batch_size, name):
+    """Run flush() on drained batches in a daemon thread and drain the remainder at exit"""
+    def worker():
+        # Flushes go through the recommender, so hold queued items until warmup is done
+        services_ready.wait()
+        while True:
+            flush(_drain(source, batch_size))
+    
+    def flush_pending():
+        while True:
+            batch = _drain(source, batch_size, block=False)
+            if not batch:
+                return
+            flush(batch)
+    
+    threading.Thread(target=worker, name=name, daemon=True).start()
+    atexit.register(flush_pending)
+
+
+_start_batch_worker(write_queue, _flush_writes, WRITE_BATCH_SIZE, 'write-behind')
+
+
+# ============================================================
+# BACKGROUND EMBEDDING
+# ============================================================
+
+EMBED_BATCH_SIZE = 64
+
+# Items are (post_id, text, payload); encoded together and upserted to Qdrant in one call
+embedding_queue = queue.Queue()
+
+
+def _flush_embeddings(batch):
+    try:
+        embeddings = recommender.embedding_model.encode(
+            [text for _, text, _ in batch],
+            batch_size=EMBED_BATCH_SIZE,
+            normalize_embeddings=True,
+            show_progress_bar=False
+        )
+        recommender.qdrant_client.upsert(
+            collection_name=recommender.collection_name,
+            points=[
+                PointStruct(id=post_id, vector=embedding.tolist(), payload=payload)
+                for (post_id, _, payload), embedding in zip(batch, embeddings)
+            ]
+        )
+        logger.info(f"💾 {len(batch)} embeddings stored in Qdrant")
     except Exception as e:
-        logger.error(f"Service initialization error: {e}")
+        logger.warning(f"Embedding storage failed for {len(batch)} posts: {e}")
+
+
+_start_batch_worker(embedding_queue, _flush_embeddings, EMBED_BATCH_SIZE, 'embedding-writer')
 
 
 # ============================================================
@@ -131,34 +515,54 @@ def before_request():
 # ============================================================
 
 
+# (state key, body, status code) of the last /health answer; the body only changes with service state or the second
+_health_cache = (None, None, None)
+
+
+def _health_status(now_iso):
+    status = {
+        'status': 'healthy',
+        'timestamp': now_iso,
+        'services': {
+            'api': 'operational'
+        }
+    }
+    
+    if not services_ready.is_set():
+        status['status'] = 'warming'
+        status['services']['recommender'] = 'loading'
+        return status, 503
+    
+    if recommender is None:
+        status['status'] = 'degraded'
+        status['services']['recommender'] = 'failed'
+        status['error'] = 'Recommender service failed to initialize'
+        return status, 503
+    
+    status['services']['recommender'] = 'operational'
+    status['services']['database'] = 'operational' if db_manager else 'unavailable'
+    return status, 200
+
+
 @app.route('/health', methods=['GET'])
 def health():
     """Health check endpoint"""
+    global _health_cache
+    now_iso = iso_now()
     try:
-        status = {
-            'status': 'healthy',
-            'timestamp': datetime.now().isoformat(),
-            'services': {
-                'api': 'operational'
-            }
-        }
-        
-        if recommender is None:
-            status['status'] = 'degraded'
-            status['services']['recommender'] = 'failed'
-            status['error'] = 'Recommender service failed to initialize'
-            return jsonify(status), 503
-        
-        status['services']['recommender'] = 'operational'
-        status['services']['database'] = 'operational' if db_manager else 'unavailable'
-        
-        return jsonify(status), 200
+        key = (now_iso, services_ready.is_set(), recommender is not None, db_manager is not None)
+        cached_key, body, code = _health_cache
+        if key != cached_key:
+            status, code = _health_status(now_iso)
+            body = app.json.dumps(status)
+            _health_cache = (key, body, code)
+        return Response(body, status=code, mimetype='application/json')
         
     except Exception as e:
         return jsonify({
             'status': 'unhealthy',
             'error': str(e),
-            'timestamp': datetime.now().isoformat()
+            'timestamp': now_iso
         }), 500
 
 @app.route('/api/user/onboard', methods=['POST'])
@@ -173,19 +577,19 @@ def user_onboarding():
     }
     """
     try:
-        data = request.get_json()
+        data, error = json_body('user_id')
+        if error:
+            return error
         
-        user_id = data.get('user_id')
+        user_id = data['user_id']
         interests = data.get('interests', [])
         
-        if not user_id:
-            return jsonify({'error': 'user_id required'}), 400
-        
         if len(interests) != 3:
             return jsonify({'error': 'Exactly 3 interests required'}), 400
         
         # Create user profile
         result = recommender.create_user_profile(user_id, interests)
+        invalidate_user(user_id)
         
         # Get initial recommendations based on interests
         recommendations, metadata = recommender.recommend(
@@ -209,30 +613,34 @@ def user_onboarding():
 def simple_recommend():
     """Simple category-based recommendations (for testing)"""
     try:
-        data = request.json
-        user_id = data.get('user_id')
+        data, error = json_body('user_id')
+        if error:
+            return error
+        user_id = data['user_id']
         limit = data.get('n', 10)
         
-        if not user_id:
-            return jsonify({'error': 'user_id required'}), 400
-        
         # Get user interests
-        user = db.users.find_one({'user_id': user_id})
+        user = get_user(user_id)
         
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
         interests = user.get('interests', [])
         
-        # Get articles from interested categories
+        # Get articles from interested categories in one round-trip: one capped branch per interest,
+        # chained with $unionWith, so each category reads at most `quota` documents
         recommendations = []
-        
-        for interest in interests:
-            articles = list(db.articles.find({'category': interest}).limit(limit // len(interests)))
-            for article in articles:
-                article['_id'] = str(article['_id'])
+        categories = list(dict.fromkeys(interests))
+        if categories:
+            quota = max(1, limit // len(categories))
+            branches = [[{'$match': {'category': category}}, {'$limit': quota}] for category in categories]
+            pipeline = branches[0] + [
+                {'$unionWith': {'coll': articles_collection.name, 'pipeline': branch}}
+                for branch in branches[1:]
+            ] + [STRINGIFY_ID]
+            for article in articles_collection.aggregate(pipeline):
                 article['score'] = 1.0
-                article['reason'] = f"Matches your interest: {interest}"
+                article['reason'] = f"Matches your interest: {article['category']}"
                 recommendations.append(article)
         
         return jsonify({
@@ -261,17 +669,16 @@ def track_interaction():
     }
     """
     try:
-        data = request.get_json()
+        data, error = json_body('user_id', 'post_id', message='user_id and post_id required')
+        if error:
+            return error
         
-        user_id = data.get('user_id')
-        post_id = data.get('post_id')
+        user_id = data['user_id']
+        post_id = data['post_id']
         action = data.get('action', 'view')
         
-        if not user_id or not post_id:
-            return jsonify({'error': 'user_id and post_id required'}), 400
-        
-        # Track interaction
-        recommender.track_interaction(user_id, post_id, action)
+        # Track interaction (persisted by the write-behind worker, which also invalidates stats)
+        write_queue.put(('track', (user_id, post_id, action)))
         
         return jsonify({
             'status': 'success',
@@ -299,25 +706,27 @@ def get_user_interests(user_id):
         logger.error(f"❌ Get interests error: {e}")
         return jsonify({'error': str(e)}), 500
 @app.route('/api/stats', methods=['GET'])
+@cached('stats', ttl=60)
 def get_stats():
     """Get database statistics"""
     try:
         if db_manager is None:
             return jsonify({"error": "Database manager not initialized"}), 500
         
-        # Get counts from database
-        articles_count = db_manager.db.articles.count_documents({})
-        users_count = db_manager.db.users.count_documents({})
-        interactions_count = db_manager.db.interactions.count_documents({})
-        
-        # Get category breakdown
-        category_counts = {}
-        if articles_count > 0:
-            pipeline = [
-                {"$group": {"_id": "$category", "count": {"$sum": 1}}}
-            ]
-            category_data = list(db_manager.db.articles.aggregate(pipeline))
-            category_counts = {item['_id']: item['count'] for item in category_data}
+        # User/interaction counts run concurrently with one $facet pass over articles
+        users_future = io_pool.submit(db_manager.db.users.count_documents, {})
+        interactions_future = io_pool.submit(db_manager.db.interactions.count_documents, {})
+        pipeline = [
+            {"$facet": {
+                "total": [{"$count": "n"}],
+                "by_category": [{"$group": {"_id": "$category", "count": {"$sum": 1}}}]
+            }}
+        ]
+        facets = next(db_manager.db.articles.aggregate(pipeline))
+        articles_count = facets['total'][0]['n'] if facets['total'] else 0
+        category_counts = {item['_id']: item['count'] for item in facets['by_category']}
+        users_count = users_future.result()
+        interactions_count = interactions_future.result()
         
         return jsonify({
             "status": "success",
@@ -325,7 +734,7 @@ def get_stats():
             "total_users": users_count,
             "total_interactions": interactions_count,
             "categories": category_counts,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": iso_now()
         })
     except Exception as e:
         logger.error(f"Error in get_stats: {str(e)}")
@@ -336,8 +745,9 @@ def get_stats():
 def get_articles():
     """Get articles with optional filtering"""
     try:
-        if db_manager is None:
-            return jsonify({"error": "Database manager not initialized"}), 500
+        # Reads articles_collection directly, so it works during warmup (before db_manager exists)
+        if articles_collection is None:
+            return jsonify({"error": "Database not connected"}), 500
         
         category = request.args.get('category')
         limit = int(request.args.get('limit', 50))
@@ -347,29 +757,32 @@ def get_articles():
         if category:
             query['category'] = category
         
-        articles = list(db.articles.find(query).skip(skip).limit(limit))
-        total = db.articles.count_documents(query)
+        # The count runs on the I/O pool while the page streams; it is only needed for the closing fields
+        total_future = io_pool.submit(articles_collection.count_documents, query)
+        articles = iter_articles(query, limit=limit, skip=skip)
         
-        for article in articles:
-            article['_id'] = str(article['_id'])
+        # Stream documents as the cursor yields them instead of materialising the whole page
+        def generate():
+            yield '{"status":"success","articles":['
+            count = 0
+            for article in articles:
+                yield (',' if count else '') + app.json.dumps(article)
+                count += 1
+            yield f'],"count":{count},"total":{total_future.result()}}}'
         
-        return jsonify({
-            "status": "success",
-            "total": total,
-            "count": len(articles),
-            "articles": articles
-        })
+        return Response(stream_with_context(generate()), mimetype='application/json')
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @app.route('/api/categories', methods=['GET'])
+@cached('categories', ttl=300)
 def get_categories():
     """Get all available categories"""
     try:
         if category_manager is None:
             return jsonify({"error": "Category manager not initialized"}), 500
         
-        categories = category_manager.get_all_categories()
+        categories = get_all_categories()
         
         return jsonify({
             "status": "success",
@@ -381,6 +794,7 @@ def get_categories():
         return jsonify({"error": str(e)}), 500
     
 @app.route('/api/category/<category_name>/posts', methods=['GET'])
+@cached('category', ttl=120)
 def get_category_posts(category_name):
     """Get top posts for a specific category"""
     try:
@@ -415,11 +829,12 @@ def train_categories():
     }
     """
     try:
-        data = request.get_json()
+        data = request.get_json(silent=True) or {}
         dataset_path = data.get('dataset_path', 'data/llama_dataset.json')
         
         # Train categories (this may take time)
         category_manager.train_categories_from_dataset(dataset_path)
+        invalidate_categories()
         
         return jsonify({
             'status': 'success',
@@ -454,6 +869,7 @@ def search():
     """
     try:
         # 1. Get parameters
+        now = datetime.now()
         query = request.args.get('q', '').strip()
         user_id = request.args.get('user_id')
         limit = int(request.args.get('limit', 10))
@@ -476,9 +892,12 @@ def search():
         
         logger.info(f"🔍 Search: '{query}' by user: {user_id}")
         
+        # The user lookup does not depend on the category, so it overlaps with detection
+        user_future = io_pool.submit(get_user, user_id) if user_id else None
+        
         # 3. Detect category from query
         try:
-            detected_categories = category_manager.detect_query_category(query)
+            detected_categories = detect_query_category(query)
         except Exception as e:
             logger.error(f"Category detection error: {e}")
             detected_categories = []
@@ -491,115 +910,104 @@ def search():
             detected_categories = [{'category': 'general', 'confidence': 0.5}]
         
         # Get primary category
-        primary_category = detected_categories[0].get('category', 'general')
-        confidence = detected_categories[0].get('confidence', detected_categories[0].get('score', 0.5))
+        primary = detected_categories[0]
+        primary_category = primary.get('category', 'general')
+        confidence = primary.get('confidence', primary.get('score', 0.5))
         
         logger.info(f"📊 Detected category: {primary_category} (confidence: {confidence})")
         
         # 4. Update user interests (if valid category)
+        # The user document is read once and shared by interest learning and the interests fallback
+        user = None
+        if user_future is not None:
+            try:
+                user = user_future.result()
+            except Exception as e:
+                logger.warning(f"User lookup failed: {e}")
+        current_interests = user.get('interests', []) if user else []
+        
         interest_added = False
         if user_id and primary_category not in SKIP_CATEGORIES:
             try:
-                user = db.users.find_one({'user_id': user_id})
-                
-                if user:
-                    current_interests = user.get('interests', [])
+                if not user:
+                    logger.warning(f"⚠️ User {user_id} not found in database")
+                elif primary_category in current_interests:
+                    logger.info(f"ℹ️ User already has interest: {primary_category}")
+                else:
+                    # One conditional write: matches only while the interest is missing, so
+                    # modified_count tells whether it was added (even if the cached user was stale)
+                    result = users_collection.update_one(
+                        {'user_id': user_id, 'interests': {'$ne': primary_category}},
+                        {
+                            '$addToSet': {'interests': primary_category},
+                            '$set': {'updated_at': now}
+                        }
+                    )
+                    interest_added = result.modified_count > 0
+                    invalidate_user(user_id)
                     
-                    # Add if not already present
-                    if primary_category not in current_interests:
-                        logger.info(f"➕ Adding new interest '{primary_category}' for user {user_id}")
-                        
-                        # Update users collection
-                        db.users.update_one(
-                            {'user_id': user_id},
-                            {
-                                '$addToSet': {'interests': primary_category},
-                                '$set': {'updated_at': datetime.now()}
-                            }
-                        )
-                        
-                        # Update user_interests collection
-                        db.user_interests.update_one(
+                    if interest_added:
+                        # Update user_interests collection (batched by the write-behind worker)
+                        write_queue.put(('write', 'user_interests', UpdateOne(
                             {'user_id': user_id, 'category': primary_category},
                             {
                                 '$set': {
                                     'score': 5.0,  # Lower than initial interests (10.0)
-                                    'last_updated': datetime.now(),
+                                    'last_updated': now,
                                     'interaction_count': 1,
                                     'learned_from': 'search'
                                 }
                             },
                             upsert=True
-                        )
-                        
-                        interest_added = True
+                        )))
                         logger.info(f"✅ Interest '{primary_category}' added to user profile")
                     else:
                         logger.info(f"ℹ️ User already has interest: {primary_category}")
-                else:
-                    logger.warning(f"⚠️ User {user_id} not found in database")
                     
             except Exception as e:
                 logger.warning(f"Failed to update user interests: {e}")
         
-        # 5. Get recommendations
-        recommendations = []
-        match_strategy = None
+        # 5. Get recommendations - all three candidate sets are fetched concurrently, first non-empty wins
+        def fetch_primary():
+            if primary_category in SKIP_CATEGORIES:
+                return []
+            return find_articles({'category': primary_category}, limit=limit)
         
-        # Strategy 1: Try to find posts in detected category
-        if primary_category not in SKIP_CATEGORIES:
-            try:
-                articles = list(db.articles.find({'category': primary_category}).limit(limit))
-                
-                if articles:
-                    for article in articles:
-                        article['_id'] = str(article['_id'])
-                        article['match_reason'] = f"Matches category: {primary_category}"
-                    recommendations = articles
-                    match_strategy = "primary_category"
-                    logger.info(f"✅ Found {len(recommendations)} posts in '{primary_category}'")
-            except Exception as e:
-                logger.error(f"Article fetch error: {e}")
+        def fetch_interests():
+            if not current_interests:
+                return []
+            return find_articles({'category': {'$in': current_interests}}, limit=limit)
         
-        # Strategy 2: Fallback to user's existing interests
-        if not recommendations and user_id:
-            try:
-                user = db.users.find_one({'user_id': user_id})
-                
-                if user:
-                    user_interests = user.get('interests', [])
-                    
-                    if user_interests:
-                        articles = list(db.articles.find({
-                            'category': {'$in': user_interests}
-                        }).limit(limit))
-                        
-                        if articles:
-                            for article in articles:
-                                article['_id'] = str(article['_id'])
-                                article['match_reason'] = f"From your interests: {article.get('category')}"
-                            recommendations = articles
-                            match_strategy = "user_interests"
-                            logger.info(f"✅ Fallback: Found {len(recommendations)} from user interests")
-            except Exception as e:
-                logger.error(f"Fallback error: {e}")
+        def fetch_popular():
+            return find_articles({}, limit=limit, sort={'views': -1})
         
-        # Strategy 3: Show popular posts (last resort)
-        if not recommendations:
+        strategies = [
+            ('primary_category', io_pool.submit(fetch_primary), lambda article: f"Matches category: {primary_category}"),
+            ('user_interests', io_pool.submit(fetch_interests), lambda article: f"From your interests: {article.get('category')}"),
+            ('popular', io_pool.submit(fetch_popular), lambda article: "Popular posts"),
+        ]
+        
+        recommendations = []
+        match_strategy = None
+        for strategy, future, reason in strategies:
+            if match_strategy is not None:
+                future.cancel()
+                continue
             try:
-                articles = list(db.articles.find().sort('views', -1).limit(limit))
-                
-                for article in articles:
-                    article['_id'] = str(article['_id'])
-                    article['match_reason'] = "Popular posts"
-                recommendations = articles
-                match_strategy = "popular"
-                logger.info(f"✅ Popular fallback: {len(recommendations)} posts")
+                articles = future.result()
             except Exception as e:
-                logger.error(f"Popular posts error: {e}")
+                logger.error(f"{strategy} fetch error: {e}")
+                continue
+            if not articles and strategy != 'popular':
+                continue
+            for article in articles:
+                article['match_reason'] = reason(article)
+            recommendations = articles
+            match_strategy = strategy
+            logger.info(f"✅ {strategy}: Found {len(recommendations)} posts")
         
-        # 6. Return response
-        return jsonify({
+        # 6. Return response - results are serialized per item while the body is being sent
+        return stream_json({
             'status': 'success',
             'query': query,
             'detected_categories': detected_categories,
@@ -611,34 +1019,33 @@ def search():
                 'interest_added': interest_added,
                 'total_results': len(recommendations),
                 'match_strategy': match_strategy,
-                'timestamp': datetime.now().isoformat()
+                'timestamp': now.isoformat()
             }
-        })
+        }, 'results')
     
     except Exception as e:
-        logger.error(f"❌ Search error: {e}")
-        import traceback
-        traceback.print_exc()
-        return jsonify({
+        logger.exception(f"❌ Search error: {e}")
+        payload = {
             'status': 'error',
-            'error': str(e),
-            'traceback': traceback.format_exc()
-        }), 500
+            'error': str(e)
+        }
+        if app.debug:
+            payload['traceback'] = traceback.format_exc()
+        return jsonify(payload), 500
     
 @app.route('/api/posts/create', methods=['POST'])
 def create_post():
-    """Create new post"""
+    """Create new post (JSON body, or form fields user_id/title/body/category)"""
     try:
-        data = request.get_json()
+        data, error = json_body('user_id', 'title', 'body', message='user_id, title, and body required', allow_form=True)
+        if error:
+            return error
         
-        user_id = data.get('user_id')
-        title = data.get('title')
-        body = data.get('body')
+        user_id = data['user_id']
+        title = data['title']
+        body = data['body']
         declared_category = data.get('category')
         
-        if not user_id or not title or not body:
-            return jsonify({'error': 'user_id, title, and body required'}), 400
-        
         # 1. Create post in MongoDB
         post = {
             'title': title,
@@ -650,10 +1057,11 @@ def create_post():
             'views': 0
         }
         
-        result = db.articles.insert_one(post)  # 'articles' collection-ல store பண்ணு
+        result = articles_collection.insert_one(post)  # 'articles' collection-ல store பண்ணு
         post_id = str(result.inserted_id)
         
         logger.info(f"✅ Post created: {post_id}")
+        invalidate_cache('stats', '/api/stats')
         
         # 2. Auto-detect category (if not provided)
         if not declared_category:
@@ -661,7 +1069,7 @@ def create_post():
                 detected = category_manager.detect_query_category(f"{title} {body}")
                 if detected:
                     detected_category = detected[0]['category']
-                    db.articles.update_one(
+                    articles_collection.update_one(
                         {'_id': result.inserted_id},
                         {'$set': {'category': detected_category}}
                     )
@@ -677,44 +1085,23 @@ def create_post():
         #     **post
         # })
         
-        # 4. Create embedding (if recommender available)
-        try:
-            full_text = f"{title} {body}"
-            embedding = recommender.embedding_model.encode(
-                full_text,
-                normalize_embeddings=True
-            )
-            
-            from qdrant_client.models import PointStruct
-            
-            recommender.qdrant_client.upsert(
-                collection_name=recommender.collection_name,
-                points=[
-                    PointStruct(
-                        id=post_id,
-                        vector=embedding.tolist(),
-                        payload={
-                            'title': title,
-                            'category': post['category'],
-                            'author_id': user_id
-                        }
-                    )
-                ]
-            )
-            logger.info(f"💾 Embedding stored in Qdrant")
-        except Exception as e:
-            logger.warning(f"Embedding storage failed: {e}")
+        # 4. Queue embedding + Qdrant upsert; the background worker batches them
+        embedding_queue.put((post_id, f"{title} {body}", {
+            'title': title,
+            'category': post['category'],
+            'author_id': user_id
+        }))
         
         return jsonify({
             'status': 'success',
             'post_id': post_id,
             'category': post['category'],
+            'indexing': 'queued',
             'message': 'Post created successfully'
         })
     
     except Exception as e:
-        logger.error(f"❌ Create post error: {e}")
-        logger.error(traceback.format_exc())
+        logger.exception(f"❌ Create post error: {e}")
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/admin/retrain', methods=['POST'])
@@ -728,6 +1115,7 @@ def retrain_all_posts():
         category_manager.train_categories_from_mongodb(
             skip_already_trained=False  # Retrain everything
         )
+        invalidate_categories()
         
         return jsonify({
             'status': 'success',
@@ -747,6 +1135,7 @@ def train_new_posts():
     """
     try:
         category_manager.train_new_posts_only()
+        invalidate_categories()
         
         return jsonify({
             'status': 'success',
@@ -762,14 +1151,19 @@ def train_new_posts():
 # ERROR HANDLERS
 # ============================================================
 
+# Constant bodies serialized once; a fresh Response per hit since add_cors_headers mutates headers
+_NOT_FOUND_BODY = app.json.dumps({'error': 'Endpoint not found'})
+_INTERNAL_ERROR_BODY = app.json.dumps({'error': 'Internal server error'})
+
+
 @app.errorhandler(404)
 def not_found(error):
-    return jsonify({'error': 'Endpoint not found'}), 404
+    return Response(_NOT_FOUND_BODY, status=404, mimetype='application/json')
 
 
 @app.errorhandler(500)
 def internal_error(error):
-    return jsonify({'error': 'Internal server error'}), 500
+    return Response(_INTERNAL_ERROR_BODY, status=500, mimetype='application/json')
 
 
 # ============================================================
@@ -781,14 +1175,13 @@ if __name__ == '__main__':
     logger.info(f"   MongoDB: {MONGO_DB}")
     logger.info(f"   Gorse: {GORSE_API_URL}")
     logger.info(f"   LLaMA: {LLAMA_API_URL}")
+    logger.info("   (development server - use `gunicorn -c gunicorn.conf.py app:app` in production)")
     
-    init_services()
-    
-    # ADD THIS LINE:
-    init_services()
-    
+    # The reloader would re-import this module in a child process and load every model twice
     app.run(
         host='127.0.0.1',
         port=5000,
-        debug=True
+        debug=Config.DEBUG,
+        threaded=True,
+        use_reloader=False
     )
\ No newline at end of file
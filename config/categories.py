@@ -3,6 +3,13 @@ Category keywords configuration for smart category detection
 Integrated with your existing LLaMA-based system
 """
 
+import sys
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
 # Main category keywords for search matching
 CATEGORY_KEYWORDS = {
     # Sports categories
@@ -178,6 +185,24 @@ CATEGORY_ALIASES = {
 }
 
 
+def _resolve_alias(alias):
+    """Follow alias -> alias chains to the final target (stopping on a cycle)"""
+    seen = {alias}
+    target = CATEGORY_ALIASES[alias]
+    while target in CATEGORY_ALIASES and target not in seen:
+        seen.add(target)
+        target = CATEGORY_ALIASES[target]
+    return target
+
+
+# Main categories map to themselves and aliases to their fully resolved target (aliases win, as before);
+# one lookup per call. Unknown names fall through unchanged, so categories added later still normalize to themselves.
+_NORMALIZE = {
+    **{sys.intern(name): sys.intern(name) for name in CATEGORY_KEYWORDS},
+    **{sys.intern(alias): sys.intern(_resolve_alias(alias)) for alias in CATEGORY_ALIASES}
+}
+
+
 def normalize_category(category):
     """
     Normalize category using aliases
@@ -189,28 +214,31 @@ def normalize_category(category):
         str: Normalized category name
     """
     category_lower = category.lower().strip()
-    
-    # Check if it's an alias
-    if category_lower in CATEGORY_ALIASES:
-        return CATEGORY_ALIASES[category_lower]
-    
-    # Check if it's already a main category
-    if category_lower in CATEGORY_KEYWORDS:
-        return category_lower
-    
-    # Return as-is if no mapping found
-    return category_lower
+    return _NORMALIZE.get(category_lower, category_lower)
+
+
+# Immutable snapshots handed out by the getters; reset whenever add_custom_keywords changes the config
+_categories_tuple = None
+_keywords_tuples = {}
 
 
 def get_all_categories():
-    """Get list of all main categories"""
-    return list(CATEGORY_KEYWORDS.keys())
+    """Get all main categories (cached tuple)"""
+    global _categories_tuple
+    if _categories_tuple is None:
+        _categories_tuple = tuple(CATEGORY_KEYWORDS)
+    return _categories_tuple
 
 
 def get_category_keywords(category):
-    """Get keywords for a specific category"""
+    """Get keywords for a specific category (cached tuple, in configured order)"""
     normalized = normalize_category(category)
-    return CATEGORY_KEYWORDS.get(normalized, [])
+    keywords = _keywords_tuples.get(normalized)
+    if keywords is None:
+        keywords = tuple(CATEGORY_KEYWORDS.get(normalized, ()))
+        if normalized in CATEGORY_KEYWORDS:
+            _keywords_tuples[normalized] = keywords
+    return keywords
 
 
 def add_custom_keywords(category, keywords):
@@ -220,6 +248,17 @@ def add_custom_keywords(category, keywords):
         CATEGORY_KEYWORDS[normalized].extend(keywords)
     else:
         CATEGORY_KEYWORDS[normalized] = keywords
+    _index_keywords(normalized, keywords)
+
+
+def token_in_category(token, category):
+    """Whether token is one of category's keywords"""
+    return token.lower().strip() in CATEGORY_KEYWORD_SETS.get(normalize_category(category), _EMPTY_SET)
+
+
+def categories_for_token(token):
+    """Categories whose keyword list contains token (one dict lookup instead of scanning every list)"""
+    return KEYWORD_TO_CATEGORIES.get(token.lower().strip(), ())
 
 
 def is_valid_category(category):
@@ -229,13 +268,76 @@ def is_valid_category(category):
             category_lower in CATEGORY_ALIASES)
 
 
+# Reverse index: keyword -> categories containing it, built once at import
+KEYWORD_TO_CATEGORIES = {}
+
+# Per-category keyword sets for O(1) membership; CATEGORY_KEYWORDS keeps the ordered lists
+CATEGORY_KEYWORD_SETS = {}
+_EMPTY_SET = frozenset()
+
+
+# Aho-Corasick automaton over every keyword; rebuilt lazily after the index changes
+_automaton = None
+
+
+def _index_keywords(category, keywords):
+    global _automaton, _categories_tuple
+    for keyword in keywords:
+        key = keyword.lower()
+        categories = KEYWORD_TO_CATEGORIES.get(key, ())
+        if category not in categories:
+            KEYWORD_TO_CATEGORIES[key] = categories + (category,)
+    CATEGORY_KEYWORD_SETS[category] = CATEGORY_KEYWORD_SETS.get(category, _EMPTY_SET) | {k.lower() for k in keywords}
+    _automaton = None
+    _categories_tuple = None
+    _keywords_tuples.pop(category, None)
+
+
+def _get_automaton():
+    global _automaton
+    if _automaton is None:
+        automaton = ahocorasick.Automaton()
+        for keyword in KEYWORD_TO_CATEGORIES:
+            automaton.add_word(keyword, keyword)
+        automaton.make_automaton()
+        _automaton = automaton
+    return _automaton
+
+
+def keywords_in_text(text):
+    """
+    Set of category keywords occurring anywhere in text (substring match, case-insensitive)
+
+    One linear Aho-Corasick pass when pyahocorasick is installed, otherwise a scan over all keywords.
+    """
+    text = text.lower()
+    if ahocorasick is None:
+        return {keyword for keyword in KEYWORD_TO_CATEGORIES if keyword in text}
+    return {keyword for _, keyword in _get_automaton().iter(text)}
+
+
+def categories_in_text(text):
+    """Set of categories with at least one keyword occurring in text"""
+    return {category for keyword in keywords_in_text(text) for category in KEYWORD_TO_CATEGORIES[keyword]}
+
+
+for _category, _keywords in CATEGORY_KEYWORDS.items():
+    _index_keywords(_category, _keywords)
+
+
 # Export for easy access
 __all__ = [
+    'KEYWORD_TO_CATEGORIES',
+    'CATEGORY_KEYWORD_SETS',
     'CATEGORY_KEYWORDS',
     'CATEGORY_ALIASES',
     'normalize_category',
     'get_all_categories',
     'get_category_keywords',
     'add_custom_keywords',
-    'is_valid_category'
+    'is_valid_category',
+    'categories_for_token',
+    'token_in_category',
+    'keywords_in_text',
+    'categories_in_text'
 ]
\ No newline at end of file
@@ -1,12 +1,21 @@
 # config.py - Centralized Configuration
 
 import os
+from functools import lru_cache
 from dotenv import load_dotenv
 from pathlib import Path
 
 load_dotenv()
 
 
+def _env_int(name, default):
+    return int(os.getenv(name, default))
+
+
+def _env_bool(name, default):
+    return os.getenv(name, str(default)).lower() == 'true'
+
+
 class Config:
     """Application configuration"""
     
@@ -16,19 +25,32 @@ class Config:
     # Database
     DB_PATH = os.getenv('DB_PATH', str(BASE_DIR / 'data' / 'reddit_posts.db'))
     
+    # MongoDB / external services (read once here; app.py uses these instead of its own getenv calls)
+    MONGO_URI = os.getenv('MONGO_URI', 'mongodb://localhost:27017/')
+    MONGO_DB = os.getenv('MONGO_DB', 'recommendation_db')
+    GORSE_API_URL = os.getenv('GORSE_API_URL', 'http://localhost:8089')
+    LLAMA_API_URL = os.getenv('LLAMA_API_URL', 'http://localhost:11434')
+    REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/1')
+    
     # Qdrant
     QDRANT_HOST = os.getenv('QDRANT_HOST', 'localhost')
-    QDRANT_PORT = int(os.getenv('QDRANT_PORT', 6333))
+    QDRANT_PORT = _env_int('QDRANT_PORT', 6333)
     QDRANT_COLLECTION = os.getenv('QDRANT_COLLECTION', 'recommendation_db_posts')
     
     # Model settings
     EMBEDDING_MODEL = 'all-MiniLM-L6-v2'
     EMBEDDING_DIM = 384
+    # FP16 is used automatically on GPU; on CPU opt in to dynamic INT8 Linear layers
+    EMBEDDING_QUANTIZE = _env_bool('EMBEDDING_QUANTIZE', False)
     
     # API settings
     API_HOST = os.getenv('API_HOST', '0.0.0.0')
-    API_PORT = int(os.getenv('API_PORT', 5000))
-    DEBUG = os.getenv('DEBUG', 'True').lower() == 'true'
+    API_PORT = _env_int('API_PORT', 5000)
+    DEBUG = _env_bool('DEBUG', True)
+    # Largest JSON request body parsed; larger ones are rejected before reading
+    MAX_JSON_BODY = _env_int('MAX_JSON_BODY', 1024 * 1024)
+    # Responses smaller than this are not worth compressing
+    COMPRESS_MIN_SIZE = _env_int('COMPRESS_MIN_SIZE', 2048)
     
     # Recommendation settings
     DEFAULT_RECOMMENDATIONS = 10
@@ -66,7 +88,8 @@ config = {
 }
 
 
-def get_config(env='development'):
-    """Get configuration based on environment"""
-    return config.get(env, DevelopmentConfig)
+@lru_cache(maxsize=None)
+def get_config(env=None):
+    """Get configuration based on environment (APP_ENV when not given), resolved once per env"""
+    return config.get(env or os.getenv('APP_ENV', 'development'), DevelopmentConfig)
 
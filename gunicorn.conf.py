@@ -0,0 +1,21 @@
+# gunicorn.conf.py - Production server settings
+# Usage: gunicorn -c gunicorn.conf.py app:app
+
+import os
+
+bind = os.getenv('GUNICORN_BIND', f"{os.getenv('API_HOST', '0.0.0.0')}:{os.getenv('API_PORT', 5000)}")
+
+# gevent workers yield on blocking socket I/O (MongoDB, Gorse, Qdrant, LLaMA), so one
+# worker serves many in-flight requests; the worker monkey-patches before loading app.py
+worker_class = 'gevent'
+workers = int(os.getenv('GUNICORN_WORKERS', 4))
+worker_connections = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', 1000))
+
+# Embedding models load per worker; give startup time to finish
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 120))
+graceful_timeout = 30
+keepalive = 5
+
+accesslog = '-'
+errorlog = '-'
+loglevel = os.getenv('LOG_LEVEL', 'info')
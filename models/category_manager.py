@@ -1,15 +1,83 @@
+import os
+import hashlib
 import logging
+import threading
 from typing import List, Dict, Optional
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 import json
 import re
 from typing import List, Dict
 import requests
-from pymongo import MongoClient
+import numpy as np
+from cachetools import LRUCache
+from pymongo import MongoClient, UpdateOne
 from sentence_transformers import SentenceTransformer
+from utils.http import get_session
+from utils.embeddings import EmbeddingCache
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
 
 logger = logging.getLogger(__name__)
 
+# Concurrent LLaMA requests during training; match the Ollama server's OLLAMA_NUM_PARALLEL
+LLAMA_PARALLEL = int(os.getenv('OLLAMA_NUM_PARALLEL', 8))
+# Queued category_scores upserts per bulk_write in dataset training
+SCORE_FLUSH_SIZE = 1000
+# Posts read from the dataset file and scored together
+DATASET_BATCH_SIZE = 1000
+# LLaMA detections kept in memory, keyed by text digest
+TEXT_CACHE_SIZE = 50_000
+# On-disk training embedding cache (set EMBEDDING_CACHE_PATH='' to disable)
+EMBEDDING_CACHE_PATH = os.getenv('EMBEDDING_CACHE_PATH', os.path.join('embedding_cache', 'category_texts.sqlite3'))
+# LLaMA only sees this much of each text, so it is also the detection cache key
+LLAMA_TEXT_CHARS = 500
+
+
+def _keyword_pattern(keywords: List[str]) -> re.Pattern:
+    """One alternation for a keyword list; pattern.search(text) is `any(kw in text for kw in keywords)`"""
+    return re.compile('|'.join(map(re.escape, keywords)))
+
+
+def _iter_dataset(dataset_path: str):
+    """Yield posts from a JSON array file, streamed with ijson when it is installed"""
+    if ijson is None:
+        with open(dataset_path, 'r') as f:
+            yield from json.load(f)
+        return
+    with open(dataset_path, 'rb') as f:
+        yield from ijson.items(f, 'item', use_float=True)
+
+
+def _text_key(text: str) -> bytes:
+    """Stable 16-byte digest used as the cache key for a text"""
+    return hashlib.blake2b(text.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+
+
+def _quantize_int8(vectors: np.ndarray):
+    """Symmetric per-row quantization: vectors ~= q * scales[:, None]"""
+    scales = (np.abs(vectors).max(axis=1) / 127.0).clip(min=1e-12).astype(np.float32)
+    q = np.rint(vectors / scales[:, None]).astype(np.int8)
+    return q, scales
+
+
+def _keyword_automaton(keywords) -> 'ahocorasick.Automaton':
+    """Aho-Corasick automaton over keywords; each word's value is the keyword itself"""
+    automaton = ahocorasick.Automaton()
+    for keyword in keywords:
+        automaton.add_word(keyword, keyword)
+    automaton.make_automaton()
+    return automaton
+
 
 class CategoryManager:
     """
@@ -22,12 +90,24 @@ class CategoryManager:
     4. Store category_scores in MongoDB
     """
     
+    # Keyword map for query detection (first matching category wins)
+    QUERY_KEYWORD_MAP = {
+        "technology": ["tech", "mobile", "laptop", "ai", "software"],
+        "finance": ["money", "loan", "bank", "investment"],
+        "agriculture": ["farm", "crop", "soil", "tractor", "agriculture"],
+        "health": ["doctor", "medicine", "health", "hospital"],
+        "education": ["study", "school", "college", "exam"],
+    }
+    
     def __init__(
         self,
         mongo_uri: str,
         mongo_db: str,
         llama_api_url: str = 'http://localhost:11434',
-        embedding_model: str = 'all-MiniLM-L6-v2'
+        embedding_model: str = 'all-MiniLM-L6-v2',
+        session: Optional[requests.Session] = None,
+        int8_scores: bool = False,
+        embedding_cache_path: Optional[str] = EMBEDDING_CACHE_PATH
     ):
         self.mongo_client = MongoClient(mongo_uri)
         self.db = self.mongo_client[mongo_db]
@@ -39,7 +119,16 @@ class CategoryManager:
         
         # Services
         self.llama_api_url = llama_api_url
+        self.session = session or get_session()
         self.embedding_model = SentenceTransformer(embedding_model)
+        # Training embeddings persisted by text hash so re-runs only encode new/changed posts
+        self.embedding_cache = EmbeddingCache(embedding_cache_path, embedding_model) if embedding_cache_path else None
+        
+        # Duplicate post bodies skip re-asking LLaMA (keyed by text digest; embeddings use embedding_cache)
+        self._llama_cache = LRUCache(maxsize=TEXT_CACHE_SIZE)
+        self._cache_lock = threading.Lock()
+        # Category names already confirmed/created in the categories collection
+        self._known_categories = set()
         
         # Predefined categories with keywords
         self.category_keywords = {
@@ -55,81 +144,99 @@ class CategoryManager:
             'business': ['business', 'startup', 'entrepreneur', 'marketing', 'company']
         }
         
-        logger.info("✅ CategoryManager initialized")
         self.categories = list(self.category_keywords.keys())
+        # keyword -> categories listing it (e.g. 'diet' counts for food and health)
+        self._keyword_categories = {}
+        for category, keywords in self.category_keywords.items():
+            for keyword in dict.fromkeys(keywords):
+                self._keyword_categories.setdefault(keyword, []).append(category)
+        # One pass over each text for all categories when pyahocorasick is installed
+        self._keyword_automaton = _keyword_automaton(self._keyword_categories) if ahocorasick else None
+        self._query_patterns = [(c, _keyword_pattern(kws)) for c, kws in self.QUERY_KEYWORD_MAP.items()]
+        # (num_categories, dim) keyword embedding matrix, encoded once up front
+        self._category_embeddings = None
+        # Opt-in int8 similarity for training batches (scores are only thresholded, so int8 cosine suffices)
+        self.int8_scores = int8_scores
+        self._category_int8 = None
+        self._get_category_embeddings()
+        logger.info("✅ CategoryManager initialized")
 
-    def train_categories_from_dataset(self, dataset_path: str):
+    def train_categories_from_dataset(self, dataset_path: str, batch_size: int = DATASET_BATCH_SIZE):
         """
         Train categories using LLaMA on dataset
         Creates category_scores for all posts
+        
+        The JSON array is streamed (ijson when installed) and scored `batch_size` posts at a time,
+        so memory stays O(batch) rather than O(dataset).
         """
         logger.info(f"🤖 Training categories from dataset: {dataset_path}")
+        self.ensure_indexes()
         
         try:
-            # Load dataset
-            with open(dataset_path, 'r') as f:
-                dataset = json.load(f)
-            
-            logger.info(f"📊 Loaded {len(dataset)} posts from dataset")
-            
-            # Process each post
             trained_count = 0
+            score_ops = []
+            posts = _iter_dataset(dataset_path)
             
-            for post in dataset:
-                post_id = post.get('_id') or post.get('id')
-                title = post.get('title', '')
-                body = post.get('body', '')
-                declared_category = post.get('category', '')
-                
-                # Combine text for analysis
-                full_text = f"{title} {body}"
+            while True:
+                dataset = list(islice(posts, batch_size))
+                if not dataset:
+                    break
                 
-                # Method 1: Keyword-based scoring (fast)
-                keyword_scores = self._calculate_keyword_scores(full_text)
+                # Method 3: Semantic similarity (embedding-based) for the whole batch -
+                # batched encode() (sentence-transformers length-sorts each call) and one (N, K) matmul
+                texts = [f"{post.get('title', '')} {post.get('body', '')}" for post in dataset]
+                text_embeddings = self._encode_texts(texts, batch_size=64)
+                semantic_matrix = self._semantic_matrix(text_embeddings)
                 
-                # Method 2: LLaMA-based category detection (accurate)
-                llama_category = self._llama_detect_category(full_text)
+                # Method 2: LLaMA-based category detection (accurate), requests in flight concurrently
+                llama_categories = self._llama_detect_categories(texts)
                 
-                # Method 3: Semantic similarity (embedding-based)
-                semantic_scores = self._calculate_semantic_scores(full_text)
+                # Method 1: Keyword-based scoring (fast), (N, K) for the whole batch
+                keyword_matrix = self._batch_keyword_scores(texts)
                 
-                # Combine scores (weighted average)
-                final_scores = {}
-                for category in self.category_keywords.keys():
-                    keyword_score = keyword_scores.get(category, 0.0)
-                    semantic_score = semantic_scores.get(category, 0.0)
-                    llama_boost = 0.3 if llama_category == category else 0.0
+                # Process each post
+                for post, keyword_row, semantic_row, llama_category in zip(dataset, keyword_matrix, semantic_matrix, llama_categories):
+                    post_id = post.get('_id') or post.get('id')
+                    declared_category = post.get('category', '')
                     
-                    # Weighted combination
-                    final_scores[category] = (
-                        0.3 * keyword_score +
-                        0.4 * semantic_score +
-                        0.3 * llama_boost
-                    )
-                
-                # Store scores in category_scores collection
-                for category, score in final_scores.items():
-                    if score > 0.1:  # Only store meaningful scores
-                        self.category_scores_collection.update_one(
-                            {
-                                'post_id': post_id,
-                                'category': category
-                            },
-                            {
-                                '$set': {
+                    # Combine scores (weighted average)
+                    final_scores = {}
+                    for i, category in enumerate(self.categories):
+                        keyword_score = float(keyword_row[i])
+                        semantic_score = float(semantic_row[i])
+                        llama_boost = 0.3 if llama_category == category else 0.0
+                        
+                        # Weighted combination
+                        final_scores[category] = (
+                            0.3 * keyword_score +
+                            0.4 * semantic_score +
+                            0.3 * llama_boost
+                        )
+                    
+                    # Store scores in category_scores collection (queued, flushed in bulk)
+                    now = datetime.now()
+                    for category, score in final_scores.items():
+                        if score > 0.1:  # Only store meaningful scores
+                            score_ops.append(UpdateOne(
+                                {'post_id': post_id, 'category': category},
+                                {'$set': {
                                     'relevance_score': score,
-                                    'trained_at': datetime.now(),
+                                    'trained_at': now,
                                     'declared_category': declared_category,
                                     'llama_detected': llama_category
-                                }
-                            },
-                            upsert=True
-                        )
-                
-                trained_count += 1
+                                }},
+                                upsert=True
+                            ))
+                    if len(score_ops) >= SCORE_FLUSH_SIZE:
+                        self.category_scores_collection.bulk_write(score_ops, ordered=False)
+                        score_ops = []
+                    
+                    trained_count += 1
                 
-                if trained_count % 10 == 0:
-                    logger.info(f"   Trained {trained_count}/{len(dataset)} posts...")
+                logger.info(f"   Trained {trained_count} posts...")
+            
+            if score_ops:
+                self.category_scores_collection.bulk_write(score_ops, ordered=False)
             
             logger.info(f"✅ Training complete! Processed {trained_count} posts")
             
@@ -140,52 +247,199 @@ class CategoryManager:
             logger.error(f"❌ Training failed: {e}")
             raise
     
-    def _calculate_keyword_scores(self, text: str) -> Dict[str, float]:
-        """Calculate category scores based on keyword matching"""
-        text_lower = text.lower()
-        scores = {}
+    def train_categories_from_mongodb(self, skip_already_trained: bool = True, batch_size: int = 64) -> int:
+        """
+        Train category scores for posts stored in MongoDB
         
-        for category, keywords in self.category_keywords.items():
-            matches = sum(1 for kw in keywords if kw in text_lower)
-            scores[category] = min(matches / len(keywords), 1.0)
+        Streams posts in cursor batches, embeds `batch_size` texts per encode()
+        call and flushes each batch's scores with one bulk_write.
+        """
+        logger.info(f"🤖 Training categories from MongoDB (skip_already_trained={skip_already_trained})")
+        self.ensure_indexes()
         
-        return scores
+        query = {'category_trained_at': {'$exists': False}} if skip_already_trained else {}
+        cursor = self.posts_collection.find(
+            query,
+            projection={'title': 1, 'body': 1, 'category': 1},
+            batch_size=1000,
+            no_cursor_timeout=True
+        )
+        
+        trained_count = 0
+        batch = []
+        try:
+            for post in cursor:
+                batch.append(post)
+                if len(batch) >= batch_size:
+                    trained_count += self._train_post_batch(batch)
+                    batch = []
+                    logger.info(f"   Trained {trained_count} posts...")
+            if batch:
+                trained_count += self._train_post_batch(batch)
+        except Exception as e:
+            logger.error(f"❌ Training failed: {e}")
+            raise
+        finally:
+            cursor.close()
+        
+        logger.info(f"✅ Training complete! Processed {trained_count} posts")
+        self._update_category_stats()
+        return trained_count
+    
+    def train_new_posts_only(self) -> int:
+        """Train only posts that have not been scored yet"""
+        return self.train_categories_from_mongodb(skip_already_trained=True)
     
-    def _calculate_semantic_scores(self, text: str) -> Dict[str, float]:
-        """Calculate category scores using semantic similarity"""
-        # Generate embedding for text
-        text_embedding = self.embedding_model.encode(text, normalize_embeddings=True)
+    def ensure_indexes(self):
+        """
+        Indexes for score upserts, top-post queries and category stats (idempotent; Mongo skips existing ones)
         
-        scores = {}
+        Each index is attempted separately so a conflict (e.g. existing duplicates) only skips that one.
+        Not run from __init__ (an unreachable server would block construction for each server-selection
+        timeout): the app calls it in the background after warmup and training calls it before writing.
+        """
+        indexes = [
+            (self.category_scores_collection, [('post_id', 1), ('category', 1)], {'unique': True}),
+            (self.category_scores_collection, [('category', 1), ('relevance_score', -1)], {}),
+            (self.categories_collection, [('name', 1)], {'unique': True}),
+        ]
+        for collection, keys, options in indexes:
+            try:
+                collection.create_index(keys, **options)
+            except Exception as e:
+                logger.warning(f"⚠️ Could not create index {keys} on {collection.name}: {e}")
+    
+    def _get_category_embeddings(self) -> np.ndarray:
+        """Normalized keyword embeddings, one row per category in self.categories"""
+        if self._category_embeddings is None:
+            self._category_embeddings = self.embedding_model.encode(
+                [' '.join(self.category_keywords[category]) for category in self.categories],
+                normalize_embeddings=True,
+                show_progress_bar=False,
+                convert_to_numpy=True
+            )
+        return self._category_embeddings
+    
+    def _encode_texts(self, texts: List[str], batch_size: int) -> np.ndarray:
+        """Normalized (N, dim) embeddings for texts, served from the disk cache where possible"""
+        if not texts:
+            return np.empty((0, self._get_category_embeddings().shape[1]), dtype=np.float32)
         
-        # Generate embeddings for each category (using keywords)
-        for category, keywords in self.category_keywords.items():
-            category_text = ' '.join(keywords)
-            category_embedding = self.embedding_model.encode(
-                category_text, 
-                normalize_embeddings=True
+        def encode(batch):
+            return self.embedding_model.encode(
+                batch,
+                batch_size=batch_size,
+                normalize_embeddings=True,
+                show_progress_bar=False,
+                convert_to_numpy=True
             )
-            
-            # Cosine similarity
-            similarity = float(text_embedding @ category_embedding.T)
-            scores[category] = max(0.0, similarity)
         
+        if self.embedding_cache is None:
+            return encode(texts)
+        return self.embedding_cache.encode(texts, encode)
+    
+    def _semantic_matrix(self, text_embeddings: np.ndarray) -> np.ndarray:
+        """(N, K) clipped cosine similarities between normalized text embeddings and the category matrix"""
+        if not self.int8_scores:
+            return np.clip(text_embeddings @ self._get_category_embeddings().T, 0.0, None)
+        if self._category_int8 is None:
+            self._category_int8 = _quantize_int8(self._get_category_embeddings())
+        cat_q, cat_scales = self._category_int8
+        text_q, text_scales = _quantize_int8(text_embeddings)
+        # int8 operands, int32 accumulation (384 * 127^2 cannot overflow), rescaled to float32
+        dots = (text_q.astype(np.int32) @ cat_q.T.astype(np.int32)).astype(np.float32)
+        return np.clip(dots * text_scales[:, None] * cat_scales[None, :], 0.0, None)
+    
+    def _train_post_batch(self, posts: List[Dict]) -> int:
+        """Score one batch of posts and write all of its category_scores in a single bulk_write"""
+        texts = [f"{post.get('title', '')} {post.get('body', '')}" for post in posts]
+        text_embeddings = self._encode_texts(texts, batch_size=len(texts))
+        semantic_scores = self._semantic_matrix(text_embeddings)
+        
+        keyword_scores = self._batch_keyword_scores(texts)
+        llama_categories = self._llama_detect_categories(texts)
+        
+        now = datetime.now()
+        score_ops = []
+        post_ops = []
+        for post, keyword_row, semantic_row, llama_category in zip(posts, keyword_scores, semantic_scores, llama_categories):
+            for i, category in enumerate(self.categories):
+                llama_boost = 0.3 if llama_category == category else 0.0
+                score = 0.3 * float(keyword_row[i]) + 0.4 * float(semantic_row[i]) + 0.3 * llama_boost
+                if score > 0.1:  # Only store meaningful scores
+                    score_ops.append(UpdateOne(
+                        {'post_id': post['_id'], 'category': category},
+                        {'$set': {
+                            'relevance_score': score,
+                            'trained_at': now,
+                            'declared_category': post.get('category', ''),
+                            'llama_detected': llama_category
+                        }},
+                        upsert=True
+                    ))
+            post_ops.append(UpdateOne({'_id': post['_id']}, {'$set': {'category_trained_at': now}}))
+        
+        if score_ops:
+            self.category_scores_collection.bulk_write(score_ops, ordered=False)
+        self.posts_collection.bulk_write(post_ops, ordered=False)
+        return len(posts)
+    
+    def _batch_keyword_scores(self, texts: List[str]) -> np.ndarray:
+        """(len(texts), K) keyword scores for a training batch, rows in self.categories order"""
+        scores = np.zeros((len(texts), len(self.categories)), dtype=np.float32)
+        for row, text in enumerate(texts):
+            keyword_scores = self._calculate_keyword_scores(text)
+            scores[row] = [keyword_scores[category] for category in self.categories]
         return scores
     
+    def _calculate_keyword_scores(self, text: str) -> Dict[str, float]:
+        """Calculate category scores based on keyword matching (distinct matched keywords / keywords per category)"""
+        hits = {category: 0 for category in self.categories}
+        for keyword in self._matched_keywords(text.lower()):
+            for category in self._keyword_categories[keyword]:
+                hits[category] += 1
+        return {
+            category: min(hits[category] / len(self.category_keywords[category]), 1.0)
+            for category in self.categories
+        }
+    
+    def _matched_keywords(self, text_lower: str) -> set:
+        """
+        Distinct category keywords occurring anywhere in text (substring match, so plurals and
+        derived forms count: 'movies' -> movie, 'farmer' -> farm)
+        """
+        if self._keyword_automaton is None:
+            return {keyword for keyword in self._keyword_categories if keyword in text_lower}
+        return {keyword for _, keyword in self._keyword_automaton.iter(text_lower)}
+    
     def _llama_detect_category(self, text: str) -> str:
-        """Use LLaMA to detect the most relevant category"""
+        """Use LLaMA to detect the most relevant category (successful answers cached per text)"""
+        snippet = text[:LLAMA_TEXT_CHARS]
+        key = _text_key(snippet)
+        with self._cache_lock:
+            detected = self._llama_cache.get(key)
+        if detected is None:
+            detected = self._llama_detect_uncached(snippet)
+            if detected is None:
+                return 'general'
+            with self._cache_lock:
+                self._llama_cache[key] = detected
+        return detected
+    
+    def _llama_detect_uncached(self, snippet: str) -> Optional[str]:
+        """One LLaMA request; None when it fails or answers with an unknown category"""
         try:
             categories_list = ', '.join(self.category_keywords.keys())
             
             prompt = f"""Analyze this content and choose the MOST relevant category.
 
-Content: "{text[:500]}"
+Content: "{snippet}"
 
 Categories: {categories_list}
 
 Reply with ONLY the category name, nothing else."""
 
-            response = requests.post(
+            response = self.session.post(
                 f"{self.llama_api_url}/api/generate",
                 json={
                     "model": "llama3.2",
@@ -208,24 +462,23 @@ Reply with ONLY the category name, nothing else."""
         except Exception as e:
             logger.warning(f"⚠️ LLaMA detection failed: {e}")
         
-        return 'general'
+        return None
+    
+    def _llama_detect_categories(self, texts: List[str]) -> List[str]:
+        """_llama_detect_category for many texts, up to LLAMA_PARALLEL requests at a time (order preserved)"""
+        if len(texts) <= 1:
+            return [self._llama_detect_category(text) for text in texts]
+        with ThreadPoolExecutor(max_workers=min(LLAMA_PARALLEL, len(texts)), thread_name_prefix='llama') as executor:
+            return list(executor.map(self._llama_detect_category, texts))
     
     def _detect_category(self, text):
         """
         Detect category based on keywords.  
-        You can expand or modify the keyword mapping anytime.
+        You can expand or modify QUERY_KEYWORD_MAP anytime.
         """
-        keyword_map = {
-            "technology": ["tech", "mobile", "laptop", "ai", "software"],
-            "finance": ["money", "loan", "bank", "investment"],
-            "agriculture": ["farm", "crop", "soil", "tractor", "agriculture"],
-            "health": ["doctor", "medicine", "health", "hospital"],
-            "education": ["study", "school", "college", "exam"],
-        }
-
         t = text.lower()
-        for category, keywords in keyword_map.items():
-            if any(k in t for k in keywords):
+        for category, pattern in self._query_patterns:
+            if pattern.search(t):
                 return category
 
         return "other"
@@ -251,13 +504,21 @@ Reply with ONLY the category name, nothing else."""
 
 
     def ensure_category_exists(self, category: str):
-        if not self.db.categories.find_one({"name": category}):
-            self.db.categories.insert_one({
+        """Create the category document on first sight; later calls for the same name skip MongoDB"""
+        if category in self._known_categories:
+            return
+        result = self.categories_collection.update_one(
+            {"name": category},
+            {"$setOnInsert": {
                 "name": category,
                 "created_at": datetime.utcnow(),
                 "auto_created": True
-            })
-            print(f"[AUTO] Created new category: {category}")
+            }},
+            upsert=True
+        )
+        if result.upserted_id is not None:
+            logger.info(f"🆕 [AUTO] Created new category: {category}")
+        self._known_categories.add(category)
 
     def get_category_top_posts(
         self,
@@ -268,39 +529,35 @@ Reply with ONLY the category name, nothing else."""
         """
         Get top posts for a category based on trained scores
         """
-        # Find high-scoring posts for this category
-        top_scores = self.category_scores_collection.find(
+        # One round-trip: top-k walk of the (category, relevance_score) index joined to posts.
+        # (post_id, category) is unique, so each post appears at most once; limit * 2 candidates
+        # are joined so score rows whose post was deleted can be backfilled.
+        pipeline = [
+            {'$match': {'category': category, 'relevance_score': {'$gte': min_score}}},
+            {'$sort': {'relevance_score': -1}},
+            {'$limit': limit * 2},
+            {'$lookup': {
+                'from': self.posts_collection.name,
+                'localField': 'post_id',
+                'foreignField': '_id',
+                'as': 'post'
+            }},
+            {'$unwind': '$post'},
+            {'$limit': limit},
+            {'$project': {'relevance_score': 1, 'post._id': 1, 'post.title': 1, 'post.category': 1, 'post.body': 1}}
+        ]
+        
+        return [
             {
-                'category': category,
-                'relevance_score': {'$gte': min_score}
+                'id': str(doc['post']['_id']),
+                'title': doc['post'].get('title', ''),
+                'category': doc['post'].get('category', ''),
+                'body': doc['post'].get('body', '')[:200],
+                'relevance_score': doc['relevance_score'],
+                'source': 'category_trained'
             }
-        ).sort('relevance_score', -1).limit(limit * 2)
-        
-        posts = []
-        seen_ids = set()
-        
-        for score_doc in top_scores:
-            post_id = score_doc['post_id']
-            
-            if post_id in seen_ids:
-                continue
-            
-            post = self.posts_collection.find_one({'_id': post_id})
-            if post:
-                posts.append({
-                    'id': str(post['_id']),
-                    'title': post.get('title', ''),
-                    'category': post.get('category', ''),
-                    'body': post.get('body', '')[:200],
-                    'relevance_score': score_doc['relevance_score'],
-                    'source': 'category_trained'
-                })
-                seen_ids.add(post_id)
-                
-                if len(posts) >= limit:
-                    break
-        
-        return posts
+            for doc in self.category_scores_collection.aggregate(pipeline)
+        ]
     
     def _update_category_stats(self):
         """Update statistics for each category"""
@@ -337,6 +594,8 @@ Reply with ONLY the category name, nothing else."""
         """Close connections"""
         if self.mongo_client:
             self.mongo_client.close()
+        if self.embedding_cache:
+            self.embedding_cache.close()
 
 
 # Example usage
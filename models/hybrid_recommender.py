@@ -3,11 +3,14 @@ from typing import List, Dict, Optional, Tuple
 from datetime import datetime
 import requests
 import json
-from pymongo import MongoClient
+from concurrent.futures import ThreadPoolExecutor
+from pymongo import MongoClient, InsertOne, UpdateOne, UpdateMany
+import torch
 from sentence_transformers import SentenceTransformer
 from qdrant_client import QdrantClient,models
 from qdrant_client.http import exceptions as qdrant_exceptions
 from qdrant_client.models import Distance, VectorParams
+from utils.http import get_session
 
 logger = logging.getLogger(__name__)
 
@@ -26,13 +29,25 @@ class HybridRecommender:
     - Existing users → Personalized (Gorse + Category + Semantic)
     """
     
+    # Interest boost per interaction type (unknown actions count as a view)
+    ACTION_WEIGHTS = {
+        'view': 1.0,
+        'click': 2.0,
+        'like': 3.0,
+        'share': 4.0
+    }
+    # Multiplier applied to all of a user's interest scores before each boost
+    DEFAULT_DECAY = 0.95
+    
     def __init__(
             self,
             mongo_uri: str,
             mongo_db: str,
             gorse_api_url: str,
             category_manager,  # Inject CategoryManager
-            embedding_model: str = 'all-MiniLM-L6-v2'
+            embedding_model: str = 'all-MiniLM-L6-v2',
+            quantize_embeddings: bool = False,
+            session: Optional[requests.Session] = None
         ):
             self.mongo_client = MongoClient(mongo_uri)
             self.db = self.mongo_client[mongo_db]  # ✅ Fixed: was 'client'
@@ -46,8 +61,11 @@ class HybridRecommender:
             
             # Services
             self.gorse_api_url = gorse_api_url
+            self.session = session or get_session()
+            # Gorse, category and semantic lookups are independent I/O; run them side by side
+            self._executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix='hybrid')
             self.category_manager = category_manager
-            self.embedding_model = SentenceTransformer(embedding_model)
+            self.embedding_model = self._load_embedding_model(embedding_model, quantize_embeddings)
             self.embedding_dim = self.embedding_model.get_sentence_embedding_dimension()
             # self.embedding_dim = 384  # ← Remove duplicate, using get_sentence_embedding_dimension() above
             
@@ -60,6 +78,18 @@ class HybridRecommender:
             logger.info("✅ HybridRecommender initialized")
             # Fix for models/hybrid_recommender.py
 
+    @staticmethod
+    def _load_embedding_model(model_name: str, quantize: bool) -> SentenceTransformer:
+        """Load the encoder in reduced precision: FP16 on GPU, dynamic INT8 Linear layers on CPU when quantize is set"""
+        model = SentenceTransformer(model_name)
+        if torch.cuda.is_available():
+            model.half()
+            logger.info("⚡ Embedding model running in FP16 on GPU")
+        elif quantize:
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+            logger.info("⚡ Embedding model quantized to INT8 (dynamic)")
+        return model
+
     def _init_qdrant(self):
         """Initialize Qdrant collection with robust error handling"""
         try:
@@ -181,7 +211,7 @@ class HybridRecommender:
         user_id: str,
         category: str,
         action: str = 'view',
-        decay_factor: float = 0.95
+        decay_factor: float = DEFAULT_DECAY
     ):
         """
         Update user interest scores based on interactions
@@ -192,41 +222,29 @@ class HybridRecommender:
         - like: +3.0
         - share: +4.0
         """
-        action_weights = {
-            'view': 1.0,
-            'click': 2.0,
-            'like': 3.0,
-            'share': 4.0
-        }
+        weight = self.ACTION_WEIGHTS.get(action, 1.0)
         
-        weight = action_weights.get(action, 1.0)
-        
-        # Decay all interests (temporal dynamics)
-        self.user_interests_collection.update_many(
-            {'user_id': user_id},
-            {
-                '$mul': {'score': decay_factor},
-                '$set': {'last_updated': datetime.now()}
-            }
-        )
-        
-        # Boost current category
-        self.user_interests_collection.update_one(
-            {
-                'user_id': user_id,
-                'category': category.lower()
-            },
-            {
-                '$inc': {
-                    'score': weight,
-                    'interaction_count': 1
-                },
-                '$set': {'last_updated': datetime.now()}
-            },
-            upsert=True
+        self.user_interests_collection.bulk_write(
+            self._interest_update_ops(user_id, category, weight, decay_factor, datetime.now()),
+            ordered=True
         )
         
         logger.info(f"📊 Updated interest: {user_id} → {category} (+{weight})")
+    
+    @staticmethod
+    def _interest_update_ops(user_id: str, category: str, weight: float, decay_factor: float, now: datetime) -> List:
+        """Decay all of a user's interests, then boost one category (must run ordered)"""
+        return [
+            UpdateMany(
+                {'user_id': user_id},
+                {'$mul': {'score': decay_factor}, '$set': {'last_updated': now}}
+            ),
+            UpdateOne(
+                {'user_id': user_id, 'category': category.lower()},
+                {'$inc': {'score': weight, 'interaction_count': 1}, '$set': {'last_updated': now}},
+                upsert=True
+            )
+        ]
  
 
     def is_safe_query(query: str) -> bool:
@@ -335,33 +353,27 @@ class HybridRecommender:
             logger.info("👤 EXISTING USER → Hybrid personalized recommendations")
             
             # Method 1: Gorse collaborative filtering (40% weight)
-            gorse_results = self._get_gorse_recommendations(user_id, limit * 2)
+            gorse_future = self._executor.submit(self._get_gorse_recommendations, user_id, limit * 2)
             
             # Method 2: Category-based (30% weight)
-            category_results = []
             if query_categories:
-                for category in query_categories:
-                    cat_posts = self.category_manager.get_category_top_posts(
-                        category=category,
-                        limit=limit
-                    )
-                    category_results.extend(cat_posts)
+                category_requests = [(category, limit) for category in query_categories]
             else:
                 # Use user's top interests
-                for interest in user_interests[:3]:
-                    cat_posts = self.category_manager.get_category_top_posts(
-                        category=interest['category'],
-                        limit=limit // 2
-                    )
-                    category_results.extend(cat_posts)
+                category_requests = [(interest['category'], limit // 2) for interest in user_interests[:3]]
+            category_futures = [
+                self._executor.submit(self.category_manager.get_category_top_posts, category=category, limit=n)
+                for category, n in category_requests
+            ]
             
             # Method 3: Semantic search (30% weight)
-            semantic_results = []
-            if query:
-                semantic_results = self._semantic_search(
-                    query=query,
-                    limit=limit * 2
-                )
+            semantic_future = self._executor.submit(self._semantic_search, query=query, limit=limit * 2) if query else None
+            
+            gorse_results = gorse_future.result()
+            category_results = []
+            for future in category_futures:
+                category_results.extend(future.result())
+            semantic_results = semantic_future.result() if semantic_future else []
             
             # Combine and score
             combined = self._merge_results(
@@ -413,7 +425,7 @@ class HybridRecommender:
             url = f"{self.gorse_api_url}/api/recommend/{user_id}"
             params = {"n": limit}
             
-            response = requests.get(url, params=params, timeout=5)
+            response = self.session.get(url, params=params, timeout=5)
             
             if response.status_code != 200:
                 logger.warning(f"⚠️ Gorse returned HTTP {response.status_code}")
@@ -562,29 +574,48 @@ class HybridRecommender:
         action: str = 'view'
     ):
         """Track user interaction"""
-        # Get post category
-        post = self.posts_collection.find_one({'_id': post_id})
-        if not post:
-            return
-        
-        category = post.get('category', 'general')
+        self.track_interactions_bulk([(user_id, post_id, action)])
+    
+    def track_interactions_bulk(self, events: List[Tuple[str, str, str]]):
+        """
+        Track a batch of (user_id, post_id, action) interactions
         
-        # Update user interests
-        self.update_user_interests(user_id, category, action)
+        One post lookup, one ordered interest bulk_write and one interaction
+        insert batch for the whole list instead of 3+ round-trips per event.
+        """
+        post_ids = list({post_id for _, post_id, _ in events})
+        categories = {
+            post['_id']: post.get('category', 'general')
+            for post in self.posts_collection.find({'_id': {'$in': post_ids}}, {'category': 1})
+        }
         
-        # Log interaction
-        self.interactions_collection.insert_one({
-            'user_id': user_id,
-            'post_id': post_id,
-            'category': category,
-            'action': action,
-            'timestamp': datetime.now()
-        })
+        now = datetime.now()
+        interest_ops = []
+        interaction_ops = []
+        tracked = []
+        for user_id, post_id, action in events:
+            category = categories.get(post_id)
+            if category is None:
+                continue
+            interest_ops.extend(self._interest_update_ops(user_id, category, self.ACTION_WEIGHTS.get(action, 1.0), self.DEFAULT_DECAY, now))
+            interaction_ops.append(InsertOne({
+                'user_id': user_id,
+                'post_id': post_id,
+                'category': category,
+                'action': action,
+                'timestamp': now
+            }))
+            tracked.append((user_id, post_id, action))
+        
+        if not tracked:
+            return
+        self.user_interests_collection.bulk_write(interest_ops, ordered=True)
+        self.interactions_collection.bulk_write(interaction_ops, ordered=False)
         
-        # Send to Gorse
-        self._send_to_gorse_feedback(user_id, post_id, action)
+        # Send to Gorse - its feedback endpoint takes a list, so one POST covers the batch
+        self._send_to_gorse_feedback_batch(tracked, now)
         
-        logger.info(f"📊 Tracked: {user_id} {action} {post_id} ({category})")
+        logger.info(f"📊 Tracked {len(tracked)} interactions")
     
     def _send_to_gorse_user(self, user_id: str, labels: List[str]):
         """Send user data to Gorse"""
@@ -594,21 +625,24 @@ class HybridRecommender:
                 "UserId": user_id,
                 "Labels": labels
             }
-            requests.post(url, json=data, timeout=2)
+            self.session.post(url, json=data, timeout=2)
         except:
             pass
     
     def _send_to_gorse_feedback(self, user_id: str, item_id: str, action: str):
         """Send feedback to Gorse"""
+        self._send_to_gorse_feedback_batch([(user_id, item_id, action)])
+    
+    def _send_to_gorse_feedback_batch(self, events: List[Tuple[str, str, str]], timestamp: Optional[datetime] = None):
+        """Send a batch of (user_id, item_id, action) feedback to Gorse in one request"""
         try:
             url = f"{self.gorse_api_url}/api/feedback"
-            feedback = {
-                "FeedbackType": action,
-                "UserId": user_id,
-                "ItemId": item_id,
-                "Timestamp": datetime.now().isoformat()
-            }
-            requests.post(url, json=[feedback], timeout=2)
+            timestamp = (timestamp or datetime.now()).isoformat()
+            feedback = [
+                {"FeedbackType": action, "UserId": user_id, "ItemId": item_id, "Timestamp": timestamp}
+                for user_id, item_id, action in events
+            ]
+            self.session.post(url, json=feedback, timeout=2)
         except:
             pass
     
@@ -631,6 +665,7 @@ class HybridRecommender:
     
     def close(self):
         """Close connections"""
+        self._executor.shutdown(wait=False)
         if self.mongo_client:
             self.mongo_client.close()
         if self.qdrant_client:
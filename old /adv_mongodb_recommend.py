@@ -2,30 +2,179 @@ import os
 import logging
 import pandas as pd
 import numpy as np
+import torch
 from pymongo import MongoClient
 from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
+from sklearn.feature_extraction.text import CountVectorizer
 import re
-from collections import Counter
+import glob
+import threading
+import traceback
+import hashlib
+from collections import Counter, OrderedDict
+from functools import lru_cache
 from datetime import datetime
 
+try:
+    import faiss
+except ImportError:
+    faiss = None
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+# Size the intra-op pool before any model is created; oversubscribing cores slows encode()
+torch.set_num_threads(min(8, os.cpu_count() or 4))
+try:
+    torch.set_num_interop_threads(2)
+except RuntimeError:
+    pass
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+MULTI_PROCESS_MIN_DOCS = 5000
+MONGO_BATCH_SIZE = 1000
+QUERY_EMBEDDING_CACHE_SIZE = 4096
+SEARCH_RESULT_CACHE_SIZE = 256
+TEXT_ANALYSIS_CACHE_SIZE = 4096
+TEXT_FIELDS = ('title','body','content','description','category','tags')
+CONTENT_FIELDS = ('title','body','content','description')
+_KEYWORD_RE = re.compile(r'\b[a-z]{3,}\b')
+_STOP_WORDS = frozenset({'the','is','at','which','on','a','an','and','or','but','in','with','to','for','of','as','by','from','that','this','these','those','are','was','were','been','be','have','has','had','do','does','did','will','would','should','could','may','might','can','it','its','about','into','through','during','before','after','above','below','up','down','out','off','over','under','again','further','then','once','here','there','when','where','why','how','all','both','each','few','more','most','other','some','such','no','nor','not','only','own','same','so','than','too','very','just','now'})
+
+def _match_keywords(keywords, texts):
+    """Return, per text, the keywords it contains - one Aho-Corasick pass per text when pyahocorasick is installed."""
+    if not keywords:
+        return [[] for _ in texts]
+    if ahocorasick is None:
+        return [[kw for kw in keywords if kw in text] for text in texts]
+    automaton = ahocorasick.Automaton()
+    for rank, kw in enumerate(keywords):
+        if kw not in automaton:
+            automaton.add_word(kw, rank)
+    automaton.make_automaton()
+    return [[keywords[rank] for rank in sorted({rank for _, rank in automaton.iter(text)})] for text in texts]
+
+def _l2_normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True).clip(min=1e-12)
+    return np.ascontiguousarray(vectors / norms)
+
+def _quantize_int8(vectors):
+    # Symmetric per-row quantization: vectors ~= q * scales[:, None]
+    scales = (np.abs(vectors).max(axis=1) / 127.0).clip(min=1e-12).astype(np.float32)
+    q = np.rint(vectors / scales[:, None]).astype(np.int8)
+    return q, scales
+
+if numba is not None:
+    @numba.njit(cache=True, nogil=True, parallel=True)
+    def _int8_dot_kernel(mat, vec, out):
+        for i in numba.prange(mat.shape[0]):
+            acc = 0
+            for j in range(mat.shape[1]):
+                acc += np.int32(mat[i, j]) * np.int32(vec[j])
+            out[i] = acc
+
+    # Compile (or load from the on-disk cache) off the import path so the first search doesn't pay for it
+    threading.Thread(target=_int8_dot_kernel, args=(np.zeros((1, 1), np.int8), np.zeros(1, np.int8), np.zeros(1, np.int32)), daemon=True).start()
+
+def _int8_dot(mat, vec):
+    """Integer dot products of every int8 row with vec, without materializing an int32 copy of mat when numba is available."""
+    if numba is None:
+        return mat.astype(np.int32) @ vec.astype(np.int32)
+    out = np.empty(mat.shape[0], dtype=np.int32)
+    _int8_dot_kernel(mat, vec, out)
+    return out
+
+RESULT_DROP_COLUMNS = ('combined_text','tags_str')
+
+def results_to_records(results):
+    """Turn smart_search results into JSON-ready dicts: helper columns dropped and scores cast column-wise, one to_dict call."""
+    if results is None or results.empty:
+        return []
+    results = results.drop(columns=[c for c in RESULT_DROP_COLUMNS if c in results.columns])
+    if 'similarity_score' in results.columns:
+        results = results.astype({'similarity_score': 'float64'})
+    return results.to_dict('records')
+
+class OnnxSentenceEncoder:
+    """ONNX Runtime drop-in for SentenceTransformer.encode (mean pooling, MiniLM-style models).
+
+    Export once with:
+        optimum-cli export onnx --model sentence-transformers/all-MiniLM-L6-v2 onnx_out
+    and optionally quantize onnx_out/model.onnx with onnxruntime.quantization.quantize_dynamic.
+    """
+    def __init__(self, model_dir, onnx_file='model.onnx', max_seq_length=128):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.ort_session = ort.InferenceSession(os.path.join(model_dir, onnx_file), options, providers=['CPUExecutionProvider'])
+        self.input_names = {i.name for i in self.ort_session.get_inputs()}
+        self.max_seq_length = max_seq_length
+        self.device = 'cpu'
+    
+    def encode(self, sentences, batch_size=32, show_progress_bar=False, convert_to_numpy=True, normalize_embeddings=False):
+        if isinstance(sentences, str):
+            sentences = [sentences]
+        order = np.argsort([-len(s) for s in sentences], kind='stable')
+        chunks = []
+        for start in range(0, len(sentences), batch_size):
+            batch = [sentences[i] for i in order[start:start + batch_size]]
+            encoded = self.tokenizer(batch, padding=True, truncation=True, max_length=self.max_seq_length, return_tensors='np')
+            feeds = {name: value.astype(np.int64) for name, value in encoded.items() if name in self.input_names}
+            token_embeddings = self.ort_session.run(None, feeds)[0]
+            mask = encoded['attention_mask'][..., None].astype(np.float32)
+            chunks.append((token_embeddings * mask).sum(axis=1) / mask.sum(axis=1).clip(min=1e-9))
+        embeddings = np.empty((len(sentences), chunks[0].shape[1]), dtype=np.float32) if chunks else np.empty((0, 0), dtype=np.float32)
+        if chunks:
+            embeddings[order] = np.concatenate(chunks)
+        return _l2_normalize(embeddings) if normalize_embeddings else embeddings
+
 class AdvancedMongoDBRecommendationSystem:
-    def __init__(self, mongo_uri='mongodb://localhost:27017/', database_name='gorse_app', collection_name='posts', model_name='all-MiniLM-L6-v2'):
+    def __init__(self, mongo_uri='mongodb://localhost:27017/', database_name='gorse_app', collection_name='posts', model_name='all-MiniLM-L6-v2', int8_search=False, max_seq_length=128, batch_size=128, onnx_model_dir=None, load_fields=TEXT_FIELDS, cache_dir='embedding_cache'):
         self.mongo_uri = mongo_uri
         self.database_name = database_name
         self.collection_name = collection_name
         self.model_name = model_name
+        self.int8_search = int8_search
+        self.max_seq_length = max_seq_length
+        self.batch_size = batch_size
+        self.onnx_model_dir = onnx_model_dir
+        self.load_fields = tuple(load_fields)
+        self.cache_dir = cache_dir
+        self._corpus_sig = None
         self.client = None
         self.db = None
         self.collection = None
         self.model = None
         self.df = None
         self.embeddings = None
+        self.index = None
+        self.embeddings_i8 = None
+        self.scales = None
+        self.vectorizer = None
+        self.token_matrix = None
+        self.vocab = None
         self.category_keywords = {}
-        self.stop_words = {'the','is','at','which','on','a','an','and','or','but','in','with','to','for','of','as','by','from','that','this','these','those','are','was','were','been','be','have','has','had','do','does','did','will','would','should','could','may','might','can','it','its','about','into','through','during','before','after','above','below','up','down','out','off','over','under','again','further','then','once','here','there','when','where','why','how','all','both','each','few','more','most','other','some','such','no','nor','not','only','own','same','so','than','too','very','just','now'}
+        self.keyword_categories = {}
+        self.cat_to_indices = {}
+        self.category_vectors = {}
+        self.stop_words = _STOP_WORDS
+        # Per-instance caches: lru_cache on the method itself would be shared across instances and pin them
+        self._encode_query = lru_cache(maxsize=QUERY_EMBEDDING_CACHE_SIZE)(self._encode_query_uncached)
+        self._keywords_cached = lru_cache(maxsize=TEXT_ANALYSIS_CACHE_SIZE)(self._extract_keywords_uncached)
+        self._category_cached = lru_cache(maxsize=TEXT_ANALYSIS_CACHE_SIZE)(self._detect_category_uncached)
+        self._result_cache = OrderedDict()
         logger.info("🔧 Initializing Advanced MongoDB Recommendation System")
         self._connect_mongodb()
         self._load_sentence_model()
@@ -47,9 +196,19 @@ class AdvancedMongoDBRecommendationSystem:
     
     def _load_sentence_model(self):
         try:
+            if self.onnx_model_dir:
+                logger.info(f"📥 Loading ONNX embedding model: {self.onnx_model_dir}")
+                self.model = OnnxSentenceEncoder(self.onnx_model_dir, max_seq_length=self.max_seq_length or 128)
+                logger.info("✅ ONNX Runtime session ready")
+                return
             logger.info(f"📥 Loading embedding model: {self.model_name}")
             self.model = SentenceTransformer(self.model_name)
-            logger.info("✅ Embedding model loaded")
+            # MiniLM was trained on 128-token inputs; a tighter cap means less padding per batch
+            if self.max_seq_length:
+                self.model.max_seq_length = self.max_seq_length
+            if str(self.model.device).startswith('cuda'):
+                self.model.half()
+            logger.info(f"✅ Embedding model loaded (device={self.model.device}, max_seq_length={self.model.max_seq_length})")
         except Exception as e:
             logger.error(f"❌ Failed to load model: {e}")
             raise
@@ -57,13 +216,17 @@ class AdvancedMongoDBRecommendationSystem:
     def _load_data_from_mongodb(self):
         try:
             logger.info(f"📂 Loading data from collection: {self.collection_name}")
-            cursor = self.collection.find({})
-            documents = list(cursor)
-            if not documents:
+            # Only fetch the fields we index/return and drop text-less documents server-side; results stream in batches
+            pipeline = [{'$project': {field: 1 for field in self.load_fields}}]
+            content_fields = [field for field in CONTENT_FIELDS if field in self.load_fields]
+            if content_fields:
+                pipeline.insert(0, {'$match': {'$or': [{field: {'$nin': [None, '']}} for field in content_fields]}})
+            cursor = self.collection.aggregate(pipeline, batchSize=MONGO_BATCH_SIZE)
+            self.df = pd.DataFrame.from_records(cursor)
+            if self.df.empty:
                 logger.warning("⚠️ No documents found")
                 self.df = pd.DataFrame()
                 return
-            self.df = pd.DataFrame(documents)
             logger.info(f"✅ Loaded {len(self.df)} documents")
             logger.info(f"📋 Columns: {list(self.df.columns)}")
             self._create_text_field()
@@ -81,11 +244,24 @@ class AdvancedMongoDBRecommendationSystem:
                     text_fields.append(field)
             logger.info(f"📝 Combining fields: {text_fields}")
             if 'tags' in self.df.columns:
-                self.df['tags_str'] = self.df['tags'].apply(lambda x: ' '.join(x) if isinstance(x, list) else str(x))
+                tags = self.df['tags']
+                is_list = np.fromiter((isinstance(x, list) for x in tags), dtype=bool, count=len(tags))
+                self.df['tags_str'] = np.where(is_list, tags.str.join(' '), tags.astype(str))
                 if 'tags_str' not in text_fields:
                     text_fields.append('tags_str')
-            self.df['combined_text'] = self.df[text_fields].fillna('').astype(str).agg(' '.join, axis=1)
+            columns = [self.df[field].fillna('').astype(str) for field in text_fields]
+            self.df['combined_text'] = columns[0].str.cat(columns[1:], sep=' ') if columns else ''
             self.df['combined_text'] = self.df['combined_text'].str.strip()
+            self.df['combined_text_lower'] = self.df['combined_text'].str.lower()
+            # Sparse term-count matrix for the category keyword index
+            self.vectorizer = CountVectorizer(lowercase=False, token_pattern=r'\b[a-z]{3,}\b', stop_words=list(self.stop_words), dtype=np.int32)
+            try:
+                self.token_matrix = self.vectorizer.fit_transform(self.df['combined_text_lower']).tocsr()
+                self.vocab = self.vectorizer.get_feature_names_out()
+            except ValueError:
+                # No document contains an indexable token
+                self.token_matrix = None
+                self.vocab = np.array([], dtype=object)
             logger.info("✅ Combined text field created")
         except Exception as e:
             logger.error(f"❌ Failed to create text field: {e}")
@@ -95,23 +271,125 @@ class AdvancedMongoDBRecommendationSystem:
         try:
             logger.info("🔄 Generating embeddings...")
             texts = self.df['combined_text'].tolist()
-            self.embeddings = self.model.encode(texts, batch_size=32, show_progress_bar=True, convert_to_numpy=True)
-            logger.info(f"✅ Embeddings generated: {self.embeddings.shape}")
+            self._corpus_sig = self._corpus_signature(texts) if self.cache_dir else None
+            emb_path = self._cache_path('npy')
+            if emb_path and os.path.exists(emb_path):
+                # Memory-map the cached matrix instead of re-running the transformer over the corpus
+                self.embeddings = np.load(emb_path, mmap_mode='r')
+                logger.info(f"⚡ Loaded cached embeddings: {self.embeddings.shape}")
+            else:
+                self.embeddings = _l2_normalize(self._encode_corpus(texts))
+                logger.info(f"✅ Embeddings generated: {self.embeddings.shape}")
+                self._write_cache(emb_path, self._save_embeddings)
+            self._build_vector_index()
         except Exception as e:
             logger.error(f"❌ Embedding generation failed: {e}")
             raise
     
-    def extract_keywords(self, text, top_n=10):
+    def _corpus_signature(self, texts):
+        digest = hashlib.sha1(f"{self.model_name}|{self.onnx_model_dir}|{self.max_seq_length}".encode())
+        for text in texts:
+            digest.update(text.encode('utf-8'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+    
+    def _cache_path(self, suffix):
+        if not self._corpus_sig:
+            return None
+        return os.path.join(self.cache_dir, f"{self._corpus_sig}.{suffix}")
+    
+    def _write_cache(self, path, writer):
+        if not path:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            writer(tmp_path)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not write cache {path}: {e}")
+    
+    def _save_embeddings(self, path):
+        # Write through a handle so np.save does not append its own .npy suffix to the temp name
+        with open(path, 'wb') as f:
+            np.save(f, self.embeddings)
+    
+    def _drop_cache(self, sig):
+        for path in glob.glob(os.path.join(self.cache_dir, f"{sig}.*")):
+            try:
+                os.remove(path)
+            except OSError as e:
+                logger.warning(f"⚠️ Could not remove stale cache {path}: {e}")
+    
+    def _encode_corpus(self, texts):
+        devices = []
+        if len(texts) > MULTI_PROCESS_MIN_DOCS and hasattr(self.model, 'start_multi_process_pool'):
+            if torch.cuda.device_count() > 0:
+                devices = [f'cuda:{i}' for i in range(torch.cuda.device_count())]
+            else:
+                devices = ['cpu'] * max(1, (os.cpu_count() or 2) // 2)
+        if len(devices) > 1:
+            logger.info(f"⚙️ Encoding {len(texts)} documents on {len(devices)} worker processes")
+            pool = self.model.start_multi_process_pool(target_devices=devices)
+            try:
+                return self.model.encode_multi_process(texts, pool, batch_size=self.batch_size, chunk_size=2000)
+            finally:
+                self.model.stop_multi_process_pool(pool)
+        # encode() sorts inputs by length internally, so each batch is padded only to its longest member
+        return self.model.encode(texts, batch_size=self.batch_size, show_progress_bar=True, convert_to_numpy=True)
+    
+    def _build_vector_index(self):
+        # Embeddings are L2-normalized, so inner product == cosine similarity
+        self.embeddings_i8, self.scales = None, None
+        if faiss is None:
+            self.index = None
+            if self.int8_search:
+                self.embeddings_i8, self.scales = _quantize_int8(self.embeddings)
+            logger.info(f"ℹ️ FAISS not installed - using NumPy {'int8' if self.int8_search else 'float32'} dot product search")
+            return
+        index_path = self._cache_path('sq8.faiss' if self.int8_search else 'flat.faiss')
+        if index_path and os.path.exists(index_path):
+            self.index = faiss.read_index(index_path)
+            logger.info(f"⚡ Loaded cached FAISS index: {self.index.ntotal} vectors")
+            return
+        self.index = self._make_faiss_index(self.embeddings)
+        logger.info(f"✅ FAISS index built: {self.index.ntotal} vectors")
+        self._write_cache(index_path, lambda path: faiss.write_index(self.index, path))
+    
+    def _make_faiss_index(self, vectors):
+        dim = vectors.shape[1]
+        if self.int8_search:
+            index = faiss.IndexScalarQuantizer(dim, faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_INNER_PRODUCT)
+            index.train(vectors)
+        else:
+            index = faiss.IndexFlatIP(dim)
+        index.add(vectors)
+        return index
+    
+    def _build_category_vectors(self):
+        """Precompute per-category row positions and contiguous vector subsets so filtered searches never copy."""
+        self.cat_to_indices = {category: positions.astype('int64') for category, positions in self.df.groupby('category', sort=False).indices.items()}
+        self.category_vectors = {}
+        for category, positions in self.cat_to_indices.items():
+            if self.index is not None:
+                self.category_vectors[category] = self._make_faiss_index(np.ascontiguousarray(self.embeddings[positions]))
+            elif self.embeddings_i8 is not None:
+                self.category_vectors[category] = (self.embeddings_i8[positions], self.scales[positions])
+            else:
+                self.category_vectors[category] = np.ascontiguousarray(self.embeddings[positions])
+    
+    def extract_keywords(self, text, top_n=10, lowercase=True):
         try:
-            text = text.lower()
-            words = re.findall(r'\b[a-z]{3,}\b', text)
-            keywords = [w for w in words if w not in self.stop_words]
-            word_freq = Counter(keywords)
-            top_keywords = [word for word, _ in word_freq.most_common(top_n)]
-            return top_keywords
+            if lowercase:
+                text = text.lower().strip()
+            return list(self._keywords_cached(text, top_n))
         except Exception as e:
             logger.error(f"Keyword extraction error: {e}")
             return []
+
+    def _extract_keywords_uncached(self, text, top_n):
+        word_freq = Counter(w for w in _KEYWORD_RE.findall(text) if w not in _STOP_WORDS)
+        return tuple(word for word, _ in word_freq.most_common(top_n))
     
     def _build_category_index(self):
         try:
@@ -119,36 +397,44 @@ class AdvancedMongoDBRecommendationSystem:
                 logger.warning("⚠️ No category column")
                 return
             logger.info("🔨 Building category keyword index...")
-            for category in self.df['category'].unique():
-                if pd.isna(category):
+            self._build_category_vectors()
+            self.category_keywords = {}
+            for category, positions in self.cat_to_indices.items():
+                if self.token_matrix is None:
+                    self.category_keywords[category] = []
                     continue
-                category_posts = self.df[self.df['category'] == category]
-                all_keywords = []
-                for _, post in category_posts.iterrows():
-                    text = post['combined_text']
-                    keywords = self.extract_keywords(text)
-                    all_keywords.extend(keywords)
-                keyword_freq = Counter(all_keywords)
-                top_keywords = [word for word, _ in keyword_freq.most_common(20)]
-                self.category_keywords[category] = top_keywords
+                counts = np.asarray(self.token_matrix[positions].sum(axis=0)).ravel()
+                top = np.argsort(-counts, kind='stable')[:20]
+                self.category_keywords[category] = self.vocab[top[counts[top] > 0]].tolist()
+            # Inverted index so detection only touches the query's own keywords
+            self.keyword_categories = {}
+            for category, top_keywords in self.category_keywords.items():
+                for kw in top_keywords:
+                    self.keyword_categories.setdefault(kw, []).append(category)
+            for category, top_keywords in self.category_keywords.items():
                 logger.info(f"  {category}: {', '.join(top_keywords[:5])}...")
             logger.info("✅ Category index built")
         except Exception as e:
             logger.error(f"❌ Failed to build category index: {e}")
     
     def detect_category(self, query):
+        try:
+            return self._category_cached(query.lower().strip())
+        except Exception as e:
+            logger.error(f"Category detection error: {e}")
+            return None
+
+    def _detect_category_uncached(self, query):
+        # Depends on category_keywords, so refresh_data clears this cache
         try:
             query_keywords = self.extract_keywords(query)
             if not query_keywords:
                 return None
-            category_scores = {}
-            for category, keywords in self.category_keywords.items():
-                matches = sum(1 for qk in query_keywords if qk in keywords)
-                if matches > 0:
-                    category_scores[category] = matches / len(query_keywords)
-            if category_scores:
-                best_category = max(category_scores, key=category_scores.get)
-                if category_scores[best_category] > 0.3:
+            matches = Counter(cat for qk in query_keywords for cat in self.keyword_categories.get(qk, ()))
+            if matches:
+                # Iterate in index order so ties resolve as before
+                best_category = max((cat for cat in self.category_keywords if cat in matches), key=matches.get)
+                if matches[best_category] / len(query_keywords) > 0.3:
                     logger.info(f"🎯 Detected category: {best_category}")
                     return best_category
             return None
@@ -156,11 +442,21 @@ class AdvancedMongoDBRecommendationSystem:
             logger.error(f"Category detection error: {e}")
             return None
     
+    def _encode_query_uncached(self, text):
+        embedding = _l2_normalize(self.model.encode([text], convert_to_numpy=True))
+        embedding.setflags(write=False)
+        return embedding
+    
     def smart_search(self, query, top_k=5, auto_detect_category=True, category_filter=None):
         try:
             if self.embeddings is None or len(self.embeddings) == 0:
                 logger.error("❌ No embeddings available")
                 return pd.DataFrame(), [], None
+            cache_key = (query, top_k, auto_detect_category, category_filter)
+            cached = self._result_cache.get(cache_key)
+            if cached is not None:
+                self._result_cache.move_to_end(cache_key)
+                return cached[0].copy(), list(cached[1]), cached[2]
             logger.info(f"🔍 Smart search: '{query}'")
             keywords = self.extract_keywords(query)
             logger.info(f"📝 Keywords: {keywords}")
@@ -169,34 +465,58 @@ class AdvancedMongoDBRecommendationSystem:
                 detected_category = self.detect_category(query)
             final_category = category_filter or detected_category
             enhanced_query = ' '.join(keywords) if keywords else query
-            df_filtered = self.df
-            embeddings_filtered = self.embeddings
+            positions = None
+            index, emb_i8, scales, embeddings = self.index, self.embeddings_i8, self.scales, self.embeddings
             if final_category and 'category' in self.df.columns:
                 logger.info(f"🎯 Filtering by: {final_category}")
-                mask = self.df['category'] == final_category
-                df_filtered = self.df[mask]
-                embeddings_filtered = self.embeddings[mask]
-            if len(df_filtered) == 0:
+                positions = self.cat_to_indices.get(final_category)
+                if positions is None:
+                    return pd.DataFrame(), keywords, final_category
+                vectors = self.category_vectors[final_category]
+                if index is not None:
+                    index = vectors
+                elif emb_i8 is not None:
+                    emb_i8, scales = vectors
+                else:
+                    embeddings = vectors
+            n_total = len(positions) if positions is not None else len(self.embeddings)
+            if n_total == 0:
                 return pd.DataFrame(), keywords, final_category
-            query_embedding = self.model.encode([enhanced_query], convert_to_numpy=True)
-            similarities = cosine_similarity(query_embedding, embeddings_filtered)[0]
-            for idx, row in df_filtered.iterrows():
-                text = row['combined_text'].lower()
-                boost = sum(0.1 for kw in keywords if kw in text)
-                similarities[df_filtered.index.get_loc(idx)] += boost
+            query_embedding = self._encode_query(enhanced_query)
+            if index is not None:
+                scores, ids = index.search(query_embedding, min(top_k * 4, n_total))
+                found = ids[0] >= 0
+                candidates = ids[0][found]
+                similarities = scores[0][found]
+            else:
+                candidates = np.arange(n_total)
+                if emb_i8 is not None:
+                    q_i8, q_scale = _quantize_int8(query_embedding)
+                    similarities = (_int8_dot(emb_i8, q_i8[0]) * (scales * q_scale[0])).astype(np.float32)
+                else:
+                    similarities = embeddings @ query_embedding[0]
+            if positions is not None:
+                candidates = positions[candidates]
+            # Boost 0.1 per keyword found as a substring; the same matches fill matched_keywords below
+            candidate_matches = _match_keywords(keywords, self.df['combined_text_lower'].to_numpy()[candidates])
+            if keywords:
+                similarities += np.fromiter(map(len, candidate_matches), dtype=np.float32, count=len(candidate_matches)) * 0.1
             top_k = min(top_k, len(similarities))
-            top_indices = similarities.argsort()[-top_k:][::-1]
-            result_df = df_filtered.iloc[top_indices].copy()
+            top_part = np.argpartition(similarities, -top_k)[len(similarities) - top_k:]
+            top_indices = top_part[np.argsort(-similarities[top_part], kind='stable')]
+            result_df = self.df.iloc[candidates[top_indices]].copy()
             result_df['similarity_score'] = similarities[top_indices]
-            result_df['matched_keywords'] = result_df['combined_text'].apply(lambda x: [kw for kw in keywords if kw in x.lower()])
+            result_df['matched_keywords'] = [candidate_matches[i] for i in top_indices]
             if '_id' in result_df.columns:
                 result_df['_id'] = result_df['_id'].astype(str)
-            result_df = result_df.reset_index(drop=True)
+            result_df = result_df.drop(columns='combined_text_lower').reset_index(drop=True)
             logger.info(f"✅ Found {len(result_df)} results")
+            self._result_cache[cache_key] = (result_df.copy(), list(keywords), final_category)
+            if len(self._result_cache) > SEARCH_RESULT_CACHE_SIZE:
+                self._result_cache.popitem(last=False)
             return result_df, keywords, final_category
         except Exception as e:
             logger.error(f"❌ Search error: {e}")
-            import traceback
             traceback.print_exc()
             return pd.DataFrame(), [], None
     
@@ -210,8 +530,13 @@ class AdvancedMongoDBRecommendationSystem:
     
     def refresh_data(self):
         logger.info("🔄 Refreshing...")
+        self._result_cache.clear()
+        self._category_cached.cache_clear()
+        previous_sig = self._corpus_sig
         self._load_data_from_mongodb()
         self._build_category_index()
+        if previous_sig and previous_sig != self._corpus_sig:
+            self._drop_cache(previous_sig)
     
     def get_categories(self):
         if 'category' in self.df.columns:
@@ -239,17 +564,15 @@ def test_advanced_system():
             print(f"🔑 Keywords: {keywords}")
             print(f"🎯 Category: {category or 'Not detected'}")
             print(f"📊 Results: {len(results)}")
-            if not results.empty:
-                for idx, row in results.iterrows():
-                    print(f"  #{idx+1} {row['title']} (Score: {row['similarity_score']:.3f})")
-                    if row['matched_keywords']:
-                        print(f"      Matched: {row['matched_keywords']}")
+            for rank, item in enumerate(results_to_records(results), 1):
+                print(f"  #{rank} {item.get('title')} (Score: {item['similarity_score']:.3f})")
+                if item['matched_keywords']:
+                    print(f"      Matched: {item['matched_keywords']}")
         print("="*70)
         print("\n✅ Test completed successfully!")
         recommender.close()
     except Exception as e:
         logger.error(f"❌ Test failed: {e}")
-        import traceback
         traceback.print_exc()
 
 if __name__ == '__main__':
@@ -1,39 +1,218 @@
 import requests
+import sys
 import json
-from typing import Dict, Any
+import time
+import queue
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Callable, Hashable, Optional
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from urllib3.util.request import ACCEPT_ENCODING
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Bodies are serialized to bytes up front; orjson when available, stdlib json otherwise
+_dumps = orjson.dumps if orjson else (lambda obj: json.dumps(obj).encode())
+_loads = orjson.loads if orjson else json.loads
+
+
+class TTLCache:
+    """
+    Small LRU cache with a max age and a stale-while-revalidate window
+
+    get() returns (value, state) where state is "fresh", "stale" (past maxage but
+    within stale_window: serve it and refresh in the background) or "miss".
+    """
+
+    __slots__ = ("maxsize", "maxage", "stale_window", "_data", "_lock")
+
+    def __init__(self, maxsize: int = 1024, maxage: float = 300.0, stale_window: float = 60.0):
+        self.maxsize = maxsize
+        self.maxage = maxage
+        self.stale_window = stale_window
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None, "miss"
+            value, stored_at = entry
+            age = time.monotonic() - stored_at
+            if age > self.maxage + self.stale_window:
+                del self._data[key]
+                return None, "miss"
+            self._data.move_to_end(key)
+            return value, "fresh" if age <= self.maxage else "stale"
+
+    def set(self, key: Hashable, value: Any):
+        with self._lock:
+            self._data[key] = (value, time.monotonic())
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+
+class CircuitBreaker:
+    """
+    Fail fast after fail_max consecutive connection failures
+
+    While open, calls are refused for reset_timeout seconds; the first call after that
+    is let through as a trial and closes the breaker again if it succeeds.
+    """
+
+    __slots__ = ("fail_max", "reset_timeout", "_failures", "_opened_at", "_lock")
+
+    def __init__(self, fail_max: int = 5, reset_timeout: float = 30.0):
+        self.fail_max = fail_max
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                self._opened_at = time.monotonic()  # one trial per window
+                return True
+            return False
+
+    def record(self, ok: bool):
+        with self._lock:
+            if ok:
+                self._failures = 0
+                self._opened_at = None
+                return
+            self._failures += 1
+            if self._failures >= self.fail_max:
+                self._opened_at = time.monotonic()
 
 
 class RecommendationClient:
     """Client for interacting with the Recommendation API"""
 
+    # Fixed attribute layout: slot descriptors instead of a per-instance __dict__ on every call path
+    __slots__ = ("base_url", "_urls", "_session", "_breaker", "_cache", "_refreshing", "_refresh_lock", "_refresh_pool")
+
     def __init__(self, base_url: str = "http://localhost:5000"):
         self.base_url = base_url.rstrip("/")
-
-    def _make_request(self, method: str, endpoint: str, **kwargs) -> Dict[str, Any]:
-        url = f"{self.base_url}{endpoint}"
+        # endpoint -> absolute URL, built once per endpoint rather than formatted on every call
+        self._urls = {}
+        # One keep-alive pool for every call instead of a new connection per request
+        self._session = requests.Session()
+        # Advertise every encoding urllib3 can decode here (gzip/deflate, plus br/zstd when installed)
+        self._session.headers.update({
+            "Content-Type": "application/json",
+            "Accept": "application/json",
+            "Accept-Encoding": ACCEPT_ENCODING
+        })
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=32,
+            # Status/read-timeout retries only for idempotent methods: POST /api/refresh rebuilds the
+            # index and must never be re-sent (connection failures are still retried for every method)
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.2,
+                status_forcelist=(429, 502, 503, 504),
+                allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,
+                respect_retry_after_header=True
+            )
+        )
+        self._breaker = CircuitBreaker()
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        # NLP lookups are pure functions of their text; repeated ones skip the round trip
+        self._cache = TTLCache()
+        self._refreshing = set()
+        self._refresh_lock = threading.Lock()
+        self._refresh_pool = ThreadPoolExecutor(max_workers=2)
+
+    def _url(self, endpoint: str) -> str:
+        url = self._urls.get(endpoint)
+        if url is None:
+            url = self._urls[endpoint] = self.base_url + endpoint
+        return url
+
+    def _make_request(self, method: str, endpoint: str, url: Optional[str] = None, **kwargs) -> Dict[str, Any]:
+        url = url or self._url(endpoint)
+        if "json" in kwargs:
+            kwargs["data"] = _dumps(kwargs.pop("json"))
+        if not self._breaker.allow():
+            return {"error": f"API unavailable (circuit open), retrying after {self._breaker.reset_timeout:.0f}s"}
         try:
-            response = requests.request(method, url, **kwargs)
-            return response.json()
-        except Exception as e:
+            response = self._session.request(method, url, timeout=kwargs.pop("timeout", (3.05, 30)), **kwargs)
+        except requests.RequestException as e:
+            # Only transport failures (after urllib3's retries) count towards opening the breaker
+            self._breaker.record(False)
             return {"error": str(e)}
+        self._breaker.record(True)
+        try:
+            # Decoding the raw bytes skips requests' charset detection
+            return _loads(response.content)
+        except ValueError:
+            return {"error": f"Non-JSON response ({response.status_code})"}
+
+    def _cached_request(self, key: Hashable, fetch: Callable[[], Dict]) -> Dict:
+        value, state = self._cache.get(key)
+        if state == "stale":
+            # Check-and-add under the lock so concurrent callers schedule at most one refresh per key
+            with self._refresh_lock:
+                schedule = key not in self._refreshing
+                if schedule:
+                    self._refreshing.add(key)
+            if schedule:
+                self._refresh_pool.submit(self._refresh, key, fetch)
+        if state != "miss":
+            return value
+        return self._store(key, fetch())
+
+    def _refresh(self, key: Hashable, fetch: Callable[[], Dict]):
+        try:
+            self._store(key, fetch())
+        finally:
+            with self._refresh_lock:
+                self._refreshing.discard(key)
+
+    def _store(self, key: Hashable, result: Dict) -> Dict:
+        # Errors are not cached so the next call retries
+        if "error" not in result:
+            self._cache.set(key, result)
+        return result
+
+    def close(self):
+        self._refresh_pool.shutdown(wait=False)
+        self._session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
 
     # -------------------- CORE ENDPOINTS (LIVE) --------------------
 
     def health(self) -> Dict:
         return self._make_request("GET", "/api/health")
 
-    def extract_keywords(self, text: str) -> Dict:
-        return self._make_request(
-            "POST",
-            "/api/extract-keywords",
-            json={"text": text}
+    def extract_keywords(self, text: str, cache_key: Optional[Hashable] = None) -> Dict:
+        return self._cached_request(
+            cache_key or ("extract_keywords", text),
+            lambda: self._make_request("POST", "/api/extract-keywords", json={"text": text})
         )
 
-    def detect_category(self, text: str) -> Dict:
-        return self._make_request(
-            "POST",
-            "/api/detect-category",
-            json={"text": text}
+    def detect_category(self, text: str, cache_key: Optional[Hashable] = None) -> Dict:
+        return self._cached_request(
+            cache_key or ("detect_category", text),
+            lambda: self._make_request("POST", "/api/detect-category", json={"text": text})
         )
 
     def search(self, query: str, top_k: int = 10) -> Dict:
@@ -63,54 +242,88 @@ class RecommendationClient:
 
 # -------------------- PRINT UTILITY --------------------
 
+# Output is formatted and written by one background thread, in submission order, so the
+# caller only enqueues a reference instead of serializing and flushing each response itself
+_output = queue.SimpleQueue()
+_NO_BODY = object()
+
+
+def _pretty(result) -> str:
+    if orjson:
+        return orjson.dumps(result, option=orjson.OPT_INDENT_2, default=str).decode()
+    return json.dumps(result, indent=2, ensure_ascii=False, default=str)
+
+
+def _output_worker():
+    while True:
+        item = _output.get()
+        if item is None:
+            return
+        title, result = item
+        lines = [f"\n{'='*60}", title, "="*60]
+        if result is not _NO_BODY:
+            lines.append(_pretty(result))
+        sys.stdout.write("\n".join(lines) + "\n")
+
+
+def print_section(title: str):
+    _output.put((title, _NO_BODY))
+
+
 def print_result(title: str, result: Dict):
-    print(f"\n{'='*60}")
-    print(title)
-    print(f"{'='*60}")
-    print(json.dumps(result, indent=2, ensure_ascii=False))
+    _output.put((title, result))
 
 
 # -------------------- EXAMPLE USAGE --------------------
 
 def main():
-    client = RecommendationClient("http://localhost:5000")
+    writer = threading.Thread(target=_output_worker, name="example-output")
+    writer.start()
+    try:
+        with RecommendationClient("http://localhost:5000") as client:
+            run_examples(client)
+    finally:
+        _output.put(None)
+        writer.join()
+
+
+def run_examples(client: RecommendationClient):
+    # Every call before the refresh is independent: issue them together over the shared
+    # session, then print in the usual order. The refresh rebuilds the index, so it runs last.
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        health = pool.submit(client.health)
+        keywords = {text: pool.submit(client.extract_keywords, text) for text in ("ajith", "thunivu", "hangman")}
+        category = pool.submit(client.detect_category, "action movies")
+        search = pool.submit(client.search, "action movies")
+        smart_search = pool.submit(client.smart_search, "technology innovation")
+        categories = pool.submit(client.get_categories)
+        stats = pool.submit(client.get_stats)
 
-    # 1. Health
-    print_result("Health Check", client.health())
+        # 1. Health
+        print_result("Health Check", health.result())
 
-    print("\n" + "="*60)
-    print("NLP FEATURES")
-    print("="*60)
+        print_section("NLP FEATURES")
 
-    print_result("Extract Keywords: ajith", client.extract_keywords("ajith"))
-    print_result("Extract Keywords: thunivu", client.extract_keywords("thunivu"))
-    print_result("Extract Keywords: hangman", client.extract_keywords("hangman"))
+        for text, future in keywords.items():
+            print_result(f"Extract Keywords: {text}", future.result())
 
-    # 2. Category Detection
-    print_result("Detect Category: action movies",
-                 client.detect_category("action movies"))
+        # 2. Category Detection
+        print_result("Detect Category: action movies", category.result())
 
-    # 3. Search
-    print("\n" + "="*60)
-    print("SEARCH")
-    print("="*60)
+        # 3. Search
+        print_section("SEARCH")
 
-    print_result("Search Results", client.search("action movies"))
-    print_result("Smart Search Results",
-                 client.smart_search("technology innovation"))
+        print_result("Search Results", search.result())
+        print_result("Smart Search Results", smart_search.result())
 
-    # 4. Categories & Stats
-    print("\n" + "="*60)
-    print("SYSTEM INFO")
-    print("="*60)
+        # 4. Categories & Stats
+        print_section("SYSTEM INFO")
 
-    print_result("Available Categories", client.get_categories())
-    print_result("Database Stats", client.get_stats())
+        print_result("Available Categories", categories.result())
+        print_result("Database Stats", stats.result())
 
     # 5. Refresh
-    print("\n" + "="*60)
-    print("REFRESH INDEX")
-    print("="*60)
+    print_section("REFRESH INDEX")
 
     print_result("Refresh Response", client.refresh_index())
 
@@ -4,17 +4,24 @@ import logging
 import requests
 from typing import List, Dict, Optional
 import time
+import threading
+from utils.http import get_session
 
 logger = logging.getLogger(__name__)
 
+HEALTH_TTL = 3.0  # seconds a probe result is reused
+
 
 class GorseService:
     """Gorse recommendation engine client - FIXED"""
     
-    def __init__(self, api_url: str, api_key: Optional[str] = None):
+    def __init__(self, api_url: str, api_key: Optional[str] = None, session: Optional[requests.Session] = None):
         self.api_url = api_url.rstrip('/')
+        self.session = session or get_session()
         self.api_key = api_key
         self.headers = {'X-API-Key': api_key} if api_key else {}
+        self._health = (float('-inf'), False)
+        self._health_lock = threading.Lock()
         logger.info(f"✅ Gorse service initialized: {api_url}")
         
         # Test connection
@@ -23,7 +30,7 @@ class GorseService:
     def _test_connection(self):
         """Test if Gorse is available"""
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.api_url}/api/health",
                 headers=self.headers,
                 timeout=5
@@ -48,7 +55,7 @@ class GorseService:
                 "Labels": labels or []
             }
             
-            response = requests.post(
+            response = self.session.post(
                 url,
                 json=data,
                 headers=self.headers,
@@ -97,7 +104,7 @@ class GorseService:
             
             logger.debug(f"Sending to Gorse: {data}")
             
-            response = requests.post(
+            response = self.session.post(
                 url,
                 json=data,
                 headers=self.headers,
@@ -139,7 +146,7 @@ class GorseService:
                 "ItemId": clean_item_id
             }]
             
-            response = requests.post(
+            response = self.session.post(
                 url,
                 json=data,
                 headers=self.headers,
@@ -166,7 +173,7 @@ class GorseService:
             url = f"{self.api_url}/api/recommend/{clean_user_id}"
             params = {"n": n}
             
-            response = requests.get(
+            response = self.session.get(
                 url,
                 params=params,
                 headers=self.headers,
@@ -196,7 +203,7 @@ class GorseService:
                 clean_category = str(category).strip()
                 params['category'] = clean_category
             
-            response = requests.get(
+            response = self.session.get(
                 url,
                 params=params,
                 headers=self.headers,
@@ -216,9 +223,19 @@ class GorseService:
             return []
     
     def is_available(self) -> bool:
-        """Check if Gorse is available"""
+        """Check if Gorse is available (probe result reused for HEALTH_TTL seconds)"""
+        # Holding the lock through the probe makes concurrent callers wait for one probe instead of stampeding
+        with self._health_lock:
+            checked_at, available = self._health
+            if time.monotonic() - checked_at < HEALTH_TTL:
+                return available
+            available = self._probe()
+            self._health = (time.monotonic(), available)
+            return available
+    
+    def _probe(self) -> bool:
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.api_url}/api/health",
                 headers=self.headers,
                 timeout=5
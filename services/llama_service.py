@@ -1,16 +1,24 @@
 import logging
+import time
+import threading
 import requests
 from typing import Dict, Optional
+from utils.http import get_session
 
 logger = logging.getLogger(__name__)
 
+HEALTH_TTL = 3.0  # seconds a probe result is reused
+
 
 class LlamaService:
     """LLaMA/Ollama API service"""
     
-    def __init__(self, api_url: str = 'http://localhost:11434', model: str = 'llama3.2'):
+    def __init__(self, api_url: str = 'http://localhost:11434', model: str = 'llama3.2', session: Optional[requests.Session] = None):
         self.api_url = api_url.rstrip('/')
+        self.session = session or get_session()
         self.model = model
+        self._health = (float('-inf'), False)
+        self._health_lock = threading.Lock()
         logger.info(f"✅ LLaMA service initialized: {api_url} ({model})")
     
     def generate(
@@ -32,7 +40,7 @@ class LlamaService:
                 }
             }
             
-            response = requests.post(url, json=data, timeout=30)
+            response = self.session.post(url, json=data, timeout=30)
             
             if response.status_code == 200:
                 return response.json().get('response', '').strip()
@@ -69,9 +77,19 @@ Reply with ONLY the category name, nothing else."""
         return None
     
     def is_available(self) -> bool:
-        """Check if LLaMA service is available"""
+        """Check if LLaMA service is available (probe result reused for HEALTH_TTL seconds)"""
+        # Holding the lock through the probe makes concurrent callers wait for one probe instead of stampeding
+        with self._health_lock:
+            checked_at, available = self._health
+            if time.monotonic() - checked_at < HEALTH_TTL:
+                return available
+            available = self._probe()
+            self._health = (time.monotonic(), available)
+            return available
+    
+    def _probe(self) -> bool:
         try:
-            response = requests.get(f"{self.api_url}/api/tags", timeout=5)
+            response = self.session.get(f"{self.api_url}/api/tags", timeout=5)
             return response.status_code == 200
         except:
             return False
\ No newline at end of file
@@ -10,6 +10,8 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from config.categories import (
     CATEGORY_KEYWORDS, 
+    KEYWORD_TO_CATEGORIES,
+    keywords_in_text,
     normalize_category, 
     is_valid_category
 )
@@ -39,22 +41,19 @@ class CategoryDetector:
         query_lower = query.lower()
         query_words = query_lower.split()
         
-        # Check each category's keywords
-        category_scores = {}
+        # One multi-pattern pass over the query, then credit each matched keyword to its categories
+        matches = {}
+        for keyword in keywords_in_text(query_lower):
+            for category in KEYWORD_TO_CATEGORIES[keyword]:
+                matches.setdefault(category, []).append(keyword)
         
-        for category, keywords in self.categories.items():
-            score = 0
-            matched_keywords = []
-            
-            for keyword in keywords:
-                if keyword in query_lower:
-                    word_count = len(keyword.split())
-                    score += word_count
-                    matched_keywords.append(keyword)
-            
-            if score > 0:
+        # Walk categories in config order so ties resolve as before
+        category_scores = {}
+        for category in self.categories:
+            matched_keywords = matches.get(category)
+            if matched_keywords:
                 category_scores[category] = {
-                    'score': score,
+                    'score': sum(len(keyword.split()) for keyword in matched_keywords),
                     'matched_keywords': matched_keywords
                 }
         
@@ -366,9 +365,9 @@ class SearchService:
         
         normalized_category = normalize_category(category)
         if normalized_category in CATEGORY_KEYWORDS:
-            for keyword in CATEGORY_KEYWORDS[normalized_category]:
-                if keyword in query_lower:
-                    matched_keywords.append(keyword)
+            # One scan of the query, then set lookups while keeping the configured keyword order
+            found = keywords_in_text(query_lower)
+            matched_keywords = [keyword for keyword in CATEGORY_KEYWORDS[normalized_category] if keyword in found]
         
         return {
             'status': 'success',
@@ -8,7 +8,8 @@ import os
 import sys
 import logging
 from datetime import datetime
-from typing import List, Dict
+from itertools import islice
+from typing import Dict, Iterable
 
 import requests
 from pymongo import MongoClient
@@ -41,17 +42,41 @@ db = client[DB_NAME]
 # ---------------------------------------------------------
 # HELPER FUNCTIONS
 # ---------------------------------------------------------
-def send_post(endpoint: str, payload: Dict):
-    headers = {"Content-Type": "application/json"}
-    if GORSE_API_KEY:
-        headers["X-API-Key"] = GORSE_API_KEY
+BATCH_SIZE = 500
+
+# Mongo interaction_type -> Gorse feedback type
+FEEDBACK_TYPES = {"view": "read", "click": "read", "like": "star"}
+
+# One keep-alive connection for the whole sync
+session = requests.Session()
+session.headers["Content-Type"] = "application/json"
+if GORSE_API_KEY:
+    session.headers["X-API-Key"] = GORSE_API_KEY
+
+def send_post(endpoint: str, payload):
     try:
-        response = requests.post(f"{GORSE_URL}{endpoint}", json=payload, headers=headers, timeout=10)
+        response = session.post(f"{GORSE_URL}{endpoint}", json=payload, timeout=10)
         return response
     except Exception as e:
         logger.error(f"Failed POST {endpoint}: {e}")
         return None
 
+def send_chunked(endpoint: str, rows: Iterable[Dict], chunk_size: int = BATCH_SIZE):
+    """POST rows to a Gorse batch endpoint chunk_size at a time; returns (success, failed) row counts"""
+    success = failed = 0
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return success, failed
+        r = send_post(endpoint, chunk)
+        if r and r.status_code in (200, 201):
+            success += len(chunk)
+            logger.info(f"📦 {endpoint}: {success} rows synced")
+        else:
+            logger.error(f"❌ Failed batch of {len(chunk)} on {endpoint}: {r.text if r else 'No response'}")
+            failed += len(chunk)
+
 def iso_timestamp(ts):
     if isinstance(ts, datetime):
         return ts.isoformat()
@@ -61,29 +86,18 @@ def iso_timestamp(ts):
 # USER SYNC
 # ---------------------------------------------------------
 def sync_users():
-    users = list(db[USERS_COLLECTION].find())
-    logger.info(f"📌 Found {len(users)} users in MongoDB")
-
-    success = 0
-    failed = 0
-
-    for u in users:
-        user_id = str(u.get("_id") or u.get("user_id"))
-        labels = u.get("interests", [])
+    logger.info(f"📌 Found {db[USERS_COLLECTION].estimated_document_count()} users in MongoDB")
 
-        payload = {
-            "UserId": user_id,
-            "Labels": labels,
+    # Streamed from the cursor and inserted through Gorse's batch endpoint
+    users = (
+        {
+            "UserId": str(u.get("_id") or u.get("user_id")),
+            "Labels": u.get("interests", []),
             "Comment": "Synced from MongoDB"
         }
-
-        r = send_post("/api/user", payload)
-        if r and r.status_code in (200, 201):
-            logger.info(f"✅ Synced user {user_id}")
-            success += 1
-        else:
-            logger.error(f"❌ Failed user {user_id}: {r.text if r else 'No response'}")
-            failed += 1
+        for u in db[USERS_COLLECTION].find({}, {"user_id": 1, "interests": 1})
+    )
+    success, failed = send_chunked("/api/users", users)
 
     logger.info(f"✔ USER SYNC DONE → {success} success / {failed} failed")
 
@@ -91,67 +105,45 @@ def sync_users():
 # POST / ITEM SYNC
 # ---------------------------------------------------------
 def sync_posts():
-    posts = list(db[POSTS_COLLECTION].find())
-    logger.info(f"📝 Found {len(posts)} posts")
-
-    success = 0
-    failed = 0
-
-    for post in posts:
-        post_id = str(post["_id"])
-        category = post.get("category", "general")
-        ts = iso_timestamp(post.get("created_at"))
-
-        payload = {
-            "ItemId": post_id,
-            "Categories": [category],
-            "Labels": [category],
-            "Timestamp": ts,
+    logger.info(f"📝 Found {db[POSTS_COLLECTION].estimated_document_count()} posts")
+
+    items = (
+        {
+            "ItemId": str(post["_id"]),
+            "Categories": [post.get("category", "general")],
+            "Labels": [post.get("category", "general")],
+            "Timestamp": iso_timestamp(post.get("created_at")),
             "Comment": post.get("title", "")[:200]
         }
-
-        r = send_post("/api/item", payload)
-        if r and r.status_code in (200, 201):
-            success += 1
-            logger.info(f"📌 Item synced {post_id}")
-        else:
-            logger.error(f"❌ Failed item {post_id}: {r.text if r else 'No response'}")
-            failed += 1
+        for post in db[POSTS_COLLECTION].find({}, {"category": 1, "created_at": 1, "title": 1})
+    )
+    success, failed = send_chunked("/api/items", items)
 
     logger.info(f"✔ ITEM SYNC DONE → {success} success / {failed} failed")
 
 # ---------------------------------------------------------
 # FEEDBACK / INTERACTIONS SYNC
 # ---------------------------------------------------------
-def sync_feedback(batch_size: int = 100):
-    interactions = list(db[INTERACTIONS_COLLECTION].find())
+def sync_feedback(batch_size: int = BATCH_SIZE):
     total_events = 0
-    batch: List[Dict] = []
-
-    for inter in interactions:
-        total_events += 1
-        user_id = str(inter.get("user_id"))
-        item_id = str(inter.get("post_id") or inter.get("item_id"))
-        if not user_id or not item_id:
-            continue
-
-        itype = inter.get("interaction_type", "view")
-        ftype = {"view": "read", "click": "read", "like": "star"}.get(itype, "read")
-        ts = iso_timestamp(inter.get("timestamp"))
-
-        batch.append({
-            "FeedbackType": ftype,
-            "UserId": user_id,
-            "ItemId": item_id,
-            "Timestamp": ts
-        })
-
-        if len(batch) >= batch_size:
-            send_post("/api/feedback", batch)
-            batch = []
-
-    if batch:
-        send_post("/api/feedback", batch)
+
+    def feedback():
+        nonlocal total_events
+        for inter in db[INTERACTIONS_COLLECTION].find():
+            total_events += 1
+            user_id = str(inter.get("user_id"))
+            item_id = str(inter.get("post_id") or inter.get("item_id"))
+            if not user_id or not item_id:
+                continue
+
+            yield {
+                "FeedbackType": FEEDBACK_TYPES.get(inter.get("interaction_type", "view"), "read"),
+                "UserId": user_id,
+                "ItemId": item_id,
+                "Timestamp": iso_timestamp(inter.get("timestamp"))
+            }
+
+    send_chunked("/api/feedback", feedback(), batch_size)
 
     logger.info(f"✔ FEEDBACK SYNC DONE → {total_events} events")
 
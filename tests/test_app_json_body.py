@@ -0,0 +1,72 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import io
+import pytest
+import app as app_module
+from config.config import Config
+
+
+@pytest.fixture
+def client():
+    """Flask test client (/api/track is warmup-exempt, so no services are needed)"""
+    app_module.app.config['TESTING'] = True
+    with app_module.app.test_client() as client:
+        yield client
+
+
+def test_missing_required_field_is_400(client):
+    response = client.post('/api/track', json={'user_id': 'user_123'})
+
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'user_id and post_id required'
+
+
+def test_non_object_body_is_400(client):
+    response = client.post('/api/track', data='not json', content_type='application/json')
+
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'JSON object body required'
+
+
+def test_oversized_body_is_413(client):
+    padding = 'x' * (Config.MAX_JSON_BODY + 1)
+    response = client.post('/api/track', json={'user_id': 'user_123', 'post_id': 'post_456', 'pad': padding})
+
+    assert response.status_code == 413
+
+
+def test_form_body_with_allow_form():
+    with app_module.app.test_request_context(
+        '/api/posts/create',
+        method='POST',
+        data={'title': 'Form title', 'body': 'Form body'}
+    ):
+        data, error = app_module.json_body('title', allow_form=True)
+
+    assert error is None
+    assert data == {'title': 'Form title', 'body': 'Form body'}
+
+
+def test_form_body_without_allow_form_is_400():
+    with app_module.app.test_request_context('/api/track', method='POST', data={'user_id': 'user_123'}):
+        data, error = app_module.json_body('user_id')
+
+    assert data is None
+    assert error[1] == 400
+
+
+def test_oversized_body_without_content_length_is_413(client):
+    padding = 'x' * (Config.MAX_JSON_BODY + 1)
+    body = app_module.app.json.dumps({'user_id': 'user_123', 'post_id': 'post_456', 'pad': padding}).encode()
+    response = client.post(
+        '/api/track',
+        input_stream=io.BytesIO(body),
+        content_type='application/json',
+        headers={'Transfer-Encoding': 'chunked'},
+        # What a WSGI server sets for chunked uploads; without it Werkzeug reads no body at all
+        environ_overrides={'wsgi.input_terminated': True}
+    )
+
+    assert response.status_code == 413
@@ -48,4 +48,28 @@ def test_get_all_categories(category_manager):
     """Test getting all categories"""
     
     categories = category_manager.get_all_categories()
-    assert isinstance(categories, list)
\ No newline at end of file
+    assert isinstance(categories, list)
+
+def test_query_category_matches_derived_forms(category_manager):
+    """Keywords match inside plurals and derived words, not only as whole words"""
+    
+    test_cases = [
+        ("farmer", "agriculture"),
+        ("farming tips", "agriculture"),
+        ("technology news", "technology"),
+        ("best laptops 2024", "technology"),
+        ("doctors near me", "health"),
+        ("banks loans", "finance")
+    ]
+    
+    for query, expected_category in test_cases:
+        assert category_manager._detect_category(query) == expected_category
+
+
+def test_keyword_scores_match_plurals(category_manager):
+    """Plural forms score the same as their singular keyword"""
+    
+    plural = category_manager._calculate_keyword_scores("new movies and films this week")
+    singular = category_manager._calculate_keyword_scores("new movie and film this week")
+    
+    assert plural['movies'] == singular['movies'] > 0
@@ -0,0 +1,121 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import threading
+import sqlite3
+import numpy as np
+import pytest
+from utils.embeddings import EmbeddingCache
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return str(tmp_path / 'cache' / 'embeddings.sqlite3')
+
+
+@pytest.fixture
+def cache(cache_path):
+    cache = EmbeddingCache(cache_path, 'test-model')
+    yield cache
+    cache.close()
+
+
+def fake_vectors(count, dim=4, seed=0):
+    return np.random.default_rng(seed).normal(size=(count, dim)).astype(np.float32)
+
+
+def test_put_and_get_round_trip(cache):
+    hashes = [EmbeddingCache.text_hash(f"text {i}") for i in range(3)]
+    vectors = fake_vectors(3)
+    cache.put_many(dict(zip(hashes, vectors)))
+
+    found = cache.get_many(hashes)
+
+    assert set(found) == set(hashes)
+    for h, vector in zip(hashes, vectors):
+        np.testing.assert_array_equal(found[h], vector)
+
+
+def test_get_batch_larger_than_lookup_chunk(cache):
+    count = EmbeddingCache.LOOKUP_CHUNK * 2 + 7
+    hashes = [EmbeddingCache.text_hash(f"post {i}") for i in range(count)]
+    vectors = fake_vectors(count)
+    cache.put_many(dict(zip(hashes, vectors)))
+
+    found = cache.get_many(hashes)
+
+    assert len(found) == count
+    np.testing.assert_array_equal(np.stack([found[h] for h in hashes]), vectors)
+
+
+def test_misses_return_nothing(cache):
+    stored = EmbeddingCache.text_hash("stored")
+    cache.put_many({stored: fake_vectors(1)[0]})
+
+    assert cache.get_many([EmbeddingCache.text_hash("never stored")]) == {}
+    assert cache.get_many([]) == {}
+    assert set(cache.get_many([stored, EmbeddingCache.text_hash("missing")])) == {stored}
+
+
+def test_keys_are_scoped_by_model(cache, cache_path):
+    h = EmbeddingCache.text_hash("shared text")
+    cache.put_many({h: fake_vectors(1)[0]})
+
+    other = EmbeddingCache(cache_path, 'other-model')
+    try:
+        assert other.get_many([h]) == {}
+    finally:
+        other.close()
+
+
+def test_encode_only_encodes_unique_misses_and_persists(cache_path):
+    calls = []
+
+    def encode_fn(texts):
+        calls.append(list(texts))
+        return np.array([[len(t), 1.0] for t in texts], dtype=np.float32)
+
+    cache = EmbeddingCache(cache_path, 'test-model')
+    first = cache.encode(['a', 'bb', 'a'], encode_fn)
+    cache.close()
+
+    assert calls == [['a', 'bb']]
+    np.testing.assert_array_equal(first[0], first[2])
+
+    reopened = EmbeddingCache(cache_path, 'test-model')
+    try:
+        second = reopened.encode(['bb', 'ccc', 'a'], encode_fn)
+    finally:
+        reopened.close()
+
+    assert calls[1:] == [['ccc']]
+    np.testing.assert_array_equal(second, [[2, 1], [3, 1], [1, 1]])
+
+
+def test_wal_mode(cache, cache_path):
+    conn = sqlite3.connect(cache_path)
+    try:
+        assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+    finally:
+        conn.close()
+
+
+def test_shared_connection_across_threads(cache):
+    errors = []
+
+    def worker(n):
+        try:
+            hashes = [EmbeddingCache.text_hash(f"thread {n} text {i}") for i in range(50)]
+            cache.put_many(dict(zip(hashes, fake_vectors(50, seed=n))))
+            assert len(cache.get_many(hashes)) == 50
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
@@ -2,7 +2,8 @@
 # utils/__init__.py
 # ============================================================
 
-from .embeddings import EmbeddingGenerator
+from .embeddings import EmbeddingGenerator, EmbeddingCache
 from .logger import setup_logger
+from .http import create_session, get_session
 
-__all__ = ['EmbeddingGenerator', 'setup_logger']
\ No newline at end of file
+__all__ = ['EmbeddingGenerator', 'EmbeddingCache', 'setup_logger', 'create_session', 'get_session']
\ No newline at end of file
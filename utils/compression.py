@@ -0,0 +1,65 @@
+import zlib
+import logging
+from flask import request
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+COMPRESSIBLE_MIMETYPES = ('application/json', 'text/html', 'text/plain')
+
+
+def _compressor(encoding):
+    """Incremental compressor with compress()/flush() for the negotiated encoding"""
+    if encoding == 'zstd':
+        return zstandard.ZstdCompressor(level=3).compressobj()
+    return zlib.compressobj(5, zlib.DEFLATED, 31)  # wbits=31 -> gzip container
+
+
+def _compress_stream(chunks, encoding):
+    """Compress chunk by chunk, sync-flushing after each so clients receive data as it is generated"""
+    compressor = _compressor(encoding)
+    sync_flush = zstandard.COMPRESSOBJ_FLUSH_BLOCK if encoding == 'zstd' else zlib.Z_SYNC_FLUSH
+    for chunk in chunks:
+        if not chunk:
+            continue
+        data = compressor.compress(chunk) + compressor.flush(sync_flush)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def init_compression(app, min_size=2048):
+    """
+    Compress JSON/text responses for clients that accept it
+
+    Buffered bodies under min_size are sent as-is; streamed bodies (unknown size) are always
+    compressed chunk by chunk so they keep streaming. zstd is preferred when zstandard is installed.
+    """
+    encodings = ['zstd', 'gzip'] if zstandard is not None else ['gzip']
+
+    @app.after_request
+    def compress_response(response):
+        if (response.status_code < 200 or response.status_code == 204 or response.direct_passthrough
+                or 'Content-Encoding' in response.headers or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+            return response
+        encoding = request.accept_encodings.best_match(encodings)
+        if encoding is None:
+            return response
+        if response.is_streamed:
+            response.response = _compress_stream(response.iter_encoded(), encoding)
+            response.headers.pop('Content-Length', None)
+        else:
+            body = response.get_data()
+            if len(body) < min_size:
+                return response
+            compressor = _compressor(encoding)
+            response.set_data(compressor.compress(body) + compressor.flush())
+        response.headers['Content-Encoding'] = encoding
+        response.vary.add('Accept-Encoding')
+        return response
+
+    logger.info(f"🗜️ Response compression enabled ({', '.join(encodings)}, min {min_size} bytes)")
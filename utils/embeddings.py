@@ -1,5 +1,9 @@
+import os
 import logging
-from typing import List, Union
+import sqlite3
+import hashlib
+import threading
+from typing import Callable, List, Union
 import numpy as np
 from sentence_transformers import SentenceTransformer
 
@@ -81,4 +85,85 @@ class EmbeddingGenerator:
         # Dot product for cosine similarity
         similarities = np.dot(candidate_embs, query_emb[0])
         
-        return similarities.tolist()
\ No newline at end of file
+        return similarities.tolist()
+
+
+class EmbeddingCache:
+    """
+    Persistent embedding cache in a local SQLite file, keyed by (model name, sha256 of text)
+    
+    Lets training re-runs skip re-encoding unchanged texts; only misses reach the model.
+    """
+    
+    # Hashes per SELECT ... IN (...), kept under SQLite's bound-parameter limit
+    LOOKUP_CHUNK = 500
+    
+    def __init__(self, path: str, model_name: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.model_name = model_name
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS embeddings ('
+            'model TEXT NOT NULL, hash BLOB NOT NULL, vector BLOB NOT NULL, PRIMARY KEY (model, hash))'
+        )
+        self._conn.commit()
+    
+    @staticmethod
+    def text_hash(text: str) -> bytes:
+        return hashlib.sha256(text.encode('utf-8', 'surrogatepass')).digest()
+    
+    def encode(self, texts: List[str], encode_fn: Callable[[List[str]], np.ndarray]) -> np.ndarray:
+        """
+        Embeddings for texts in input order; encode_fn is called once with the unique cache misses
+        
+        encode_fn must return an (n, dim) array and always be configured the same way
+        (e.g. normalized) for a given model_name, since vectors are stored as returned.
+        """
+        hashes = [self.text_hash(text) for text in texts]
+        found = self.get_many(set(hashes))
+        
+        missing = {}
+        for h, text in zip(hashes, texts):
+            if h not in found and h not in missing:
+                missing[h] = text
+        if missing:
+            vectors = np.asarray(encode_fn(list(missing.values())), dtype=np.float32)
+            fresh = dict(zip(missing, vectors))
+            self.put_many(fresh)
+            found.update(fresh)
+        
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+        return np.stack([found[h] for h in hashes])
+    
+    def get_many(self, hashes) -> dict:
+        """hash -> vector for every hash present in the cache (misses are simply absent)"""
+        found = {}
+        hashes = list(hashes)
+        with self._lock:
+            for start in range(0, len(hashes), self.LOOKUP_CHUNK):
+                chunk = hashes[start:start + self.LOOKUP_CHUNK]
+                rows = self._conn.execute(
+                    f"SELECT hash, vector FROM embeddings WHERE model = ? AND hash IN ({','.join('?' * len(chunk))})",
+                    [self.model_name, *chunk]
+                )
+                for h, blob in rows:
+                    found[h] = np.frombuffer(blob, dtype=np.float32)
+        return found
+    
+    def put_many(self, vectors: dict):
+        """Store hash -> vector pairs in one transaction"""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO embeddings (model, hash, vector) VALUES (?, ?, ?)',
+                [(self.model_name, h, np.ascontiguousarray(v, dtype=np.float32).tobytes()) for h, v in vectors.items()]
+            )
+    
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,34 @@
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def create_session(pool_connections: int = 32, pool_maxsize: int = 64, retries: int = 2) -> requests.Session:
+    """
+    Build a keep-alive requests.Session with a sized urllib3 connection pool
+
+    Idempotent requests (GET/HEAD/...) are retried on connection errors with a short backoff.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=Retry(total=retries, backoff_factor=0.1)
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def get_session() -> requests.Session:
+    """Process-wide session shared by the Gorse/LLaMA clients so connections are reused across calls"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = create_session()
+    return _session
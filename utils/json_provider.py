@@ -0,0 +1,55 @@
+import logging
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+
+def _default(obj):
+    """Fallback for types orjson does not handle natively (ObjectId, Decimal, ...)"""
+    try:
+        return DefaultJSONProvider.default(obj)
+    except TypeError:
+        return str(obj)
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider backed by orjson
+
+    jsonify() and request.get_json() go through this once it is set as app.json.
+    datetimes serialize as ISO 8601, naive values are treated as UTC, and numpy
+    arrays / non-string dict keys are handled natively.
+    """
+
+    # orjson never sorts or indents; mirrored here so app.json reports the real behaviour
+    sort_keys = False
+    compact = True
+    option = (orjson.OPT_NAIVE_UTC | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS) if orjson else 0
+
+    def dumps(self, obj, **kwargs) -> str:
+        return orjson.dumps(obj, default=_default, option=self.option).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=_default, option=self.option),
+            mimetype=self.mimetype
+        )
+
+
+def init_json_provider(app):
+    """Use orjson for all Flask JSON when it is installed; otherwise at least skip key sorting and indentation"""
+    if orjson is None:
+        logger.info("ℹ️ orjson not installed - using Flask's default JSON provider")
+        app.json.sort_keys = False
+        app.json.compact = True
+        return
+    app.json = OrjsonProvider(app)